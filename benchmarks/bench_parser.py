@@ -0,0 +1,65 @@
+"""
+Throughput benchmark for CommandParser.
+
+    python benchmarks/bench_parser.py [--n 200000]
+
+Reports commands/sec for uncached parses (every command unique) and for
+repeated commands served from the LRU cache.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.parser import CommandParser, SymbolIndex, _parse_cached
+
+BASES = ["BTC", "ETH", "BNB", "SOL", "XRP", "DOGE", "ADA", "AVAX", "LINK", "1000PEPE", "1000SHIB", "LONG", "SHORTS"]
+TEMPLATES = [
+    "buy {qty} {sym} at market",
+    "limit sell {qty} {sym} at {price}",
+    "stop limit buy {qty} {sym} price {price} trigger {stop}",
+    "go long {qty} {sym}",
+    "Short {qty} {sym} at {price}",
+]
+
+def make_commands(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    commands = []
+    for i in range(n):
+        commands.append(rng.choice(TEMPLATES).format(
+            qty=f"{rng.uniform(0.001, 10):.3f}",
+            sym=rng.choice(BASES).lower(),
+            price=f"{1000 + i * 0.01:.2f}",
+            stop=f"{999 + i * 0.01:.2f}",
+        ))
+    return commands
+
+def run(label: str, commands, clear_cache: bool):
+    if clear_cache:
+        _parse_cached.cache_clear()
+    parse = CommandParser.parse
+    started = time.perf_counter()
+    for command in commands:
+        parse(command)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<10} {len(commands):>9,} commands in {elapsed:6.3f}s -> {len(commands) / elapsed:>12,.0f} commands/sec")
+
+def main():
+    parser = argparse.ArgumentParser(description="CommandParser throughput benchmark")
+    parser.add_argument("--n", type=int, default=200_000, help="Number of commands")
+    args = parser.parse_args()
+
+    CommandParser.set_symbol_index(SymbolIndex([
+        {"symbol": f"{b}USDT", "baseAsset": b, "quoteAsset": "USDT"} for b in BASES
+    ]))
+    unique = make_commands(args.n)
+    repeated = make_commands(1000) * (args.n // 1000)
+
+    run("uncached", unique, clear_cache=True)
+    run("cached", repeated, clear_cache=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Cold-start benchmark for the bot's entry points.
+
+    python benchmarks/bench_startup.py [--repeat 5] [--scale 1.0] [--entry cli]
+
+Imports each entry point in a fresh interpreter with `python -X importtime`
+and reports the median import cost (interpreter startup excluded) next to
+its budget. Also checks that heavy optional dependencies stay out of paths
+that do not need them. Exits non-zero if any budget or check fails, so it
+can run in CI as a regression gate.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (modules imported, budget in ms, modules that must not be loaded)
+ENTRY_POINTS = {
+    "cli": (["bot.cli"], 250, ["questionary", "prompt_toolkit", "numpy", "fastapi"]),
+    "api": (["bot.api"], 1200, ["numpy", "websocket", "questionary"]),
+    "runtime": (["bot.runtime"], 250, ["numpy", "questionary", "fastapi"]),
+    "audit": (["bot.audit"], 100, ["requests", "numpy"]),
+    # The dashboard script itself can't be imported outside `streamlit run`;
+    # this is what every fresh Streamlit process loads before rendering.
+    "dashboard": (["streamlit", "requests", "bot.config", "bot.parser"], 1500, ["numpy.random", "fastapi"]),
+}
+
+def _import_times(modules):
+    """
+    Runs one fresh interpreter; returns ({top-level module: cumulative µs}, loaded module names).
+    """
+    code = ";".join([f"import {m}" for m in modules] + ["import sys", "print(' '.join(sys.modules))"])
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": ROOT, "SIMULATION_MODE": "true"}
+    )
+    if result.returncode != 0:
+        error = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"importing {', '.join(modules)} failed: {error[-1] if error else result.returncode}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Top-level imports have a single space before the name; nested ones are indented
+        if name.startswith(" ") and not name.startswith("  ") and cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times, set(result.stdout.split())
+
+def measure(modules, repeat: int):
+    baseline, _ = _import_times([])
+    samples, loaded = [], set()
+    _import_times(modules)  # warm-up: compile .pyc files
+    for _ in range(repeat):
+        times, loaded = _import_times(modules)
+        samples.append(sum(us for name, us in times.items() if name not in baseline) / 1000)
+    return statistics.median(samples), loaded
+
+def main():
+    parser = argparse.ArgumentParser(description="Entry point import-time benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (e.g. 2 on slow CI machines)")
+    parser.add_argument("--entry", action="append", choices=list(ENTRY_POINTS), help="Only run these entry points")
+    args = parser.parse_args()
+
+    failures = 0
+    for name in args.entry or ENTRY_POINTS:
+        modules, budget, forbidden = ENTRY_POINTS[name]
+        budget *= args.scale
+        try:
+            median_ms, loaded = measure(modules, args.repeat)
+        except RuntimeError as e:
+            print(f"{name:<10} ERROR  {e}")
+            failures += 1
+            continue
+
+        leaked = [m for m in forbidden if m in loaded]
+        ok = median_ms <= budget and not leaked
+        failures += not ok
+        status = "OK  " if ok else "FAIL"
+        print(f"{name:<10} {status} {median_ms:8.1f} ms (budget {budget:.0f} ms)"
+              + (f"  unexpected imports: {', '.join(leaked)}" if leaked else ""))
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
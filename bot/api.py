@@ -1,17 +1,42 @@
 import logging
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional, TYPE_CHECKING
 from bot.client import BinanceClient
 from bot.orders import OrderManager
+from bot.resilience import OutcomeUnknownError
 from bot.validators import InputValidator
 from bot.logging_config import setup_logging
 
+# Depth books and the scanner (NumPy) are imported on first use, so pods that
+# only place orders never pay for them at cold start.
+if TYPE_CHECKING:
+    from bot.depth import DepthBookManager
+    from bot.scanner import FundingScanner
+
 # Initialize logging
 setup_logging()
 
 app = FastAPI(title="Binance Trading Bot API")
 
+# Local order books, created on first /depth request and kept for the process lifetime
+depth_books: Optional["DepthBookManager"] = None
+
+# Funding/mark-price scanner, started on first /scanner request
+funding_scanner: Optional["FundingScanner"] = None
+
+def get_depth_book(symbol: str):
+    global depth_books
+    if depth_books is None:
+        from bot.depth import DepthBookManager
+        depth_books = DepthBookManager(BinanceClient())
+    # Unknown symbols raise ValueError here, before any book or stream is created
+    depth_books.track([InputValidator.validate_symbol(symbol.upper())])
+    book = depth_books.book(symbol)
+    if not book.synced:
+        raise HTTPException(status_code=503, detail=f"Depth book for {symbol.upper()} is syncing, retry shortly")
+    return book
+
 class OrderRequest(BaseModel):
     symbol: str = Field(..., example="BTCUSDT")
     side: str = Field(..., example="BUY")
@@ -20,6 +45,32 @@ class OrderRequest(BaseModel):
     price: Optional[float] = None
     stop_price: Optional[float] = None
 
+class ModifyRequest(BaseModel):
+    symbol: str = Field(..., example="BTCUSDT")
+    order_id: int = Field(..., gt=0)
+    side: str = Field(..., example="BUY")
+    quantity: float = Field(..., gt=0)
+    price: float = Field(..., gt=0)
+
+class BatchModifyRequest(BaseModel):
+    orders: List[ModifyRequest]
+
+class BatchCancelRequest(BaseModel):
+    symbol: str = Field(..., example="BTCUSDT")
+    order_ids: List[int]
+
+# One manager per process so cancels and re-quotes reuse the client's warm connections
+_order_manager: Optional[OrderManager] = None
+
+def get_order_manager() -> OrderManager:
+    global _order_manager
+    if _order_manager is None:
+        _order_manager = OrderManager(BinanceClient())
+    return _order_manager
+
+def _validated_modify(order: ModifyRequest) -> dict:
+    return InputValidator.validate_command({"type": "MODIFY", **order.model_dump()})
+
 @app.post("/place_order")
 async def place_order(order: OrderRequest):
     try:
@@ -37,19 +88,7 @@ async def place_order(order: OrderRequest):
         client_wrapper = BinanceClient()
         order_manager = OrderManager(client_wrapper)
         
-        response = None
-        if clean_data['type'] == 'MARKET':
-            response = order_manager.place_market_order(
-                clean_data['symbol'], clean_data['side'], clean_data['quantity']
-            )
-        elif clean_data['type'] == 'LIMIT':
-            response = order_manager.place_limit_order(
-                clean_data['symbol'], clean_data['side'], clean_data['quantity'], clean_data['price']
-            )
-        elif clean_data['type'] == 'STOP_LIMIT':
-            response = order_manager.place_stop_limit_order(
-                clean_data['symbol'], clean_data['side'], clean_data['quantity'], clean_data['price'], clean_data['stop_price']
-            )
+        response = order_manager.place_order(clean_data)
             
         return {
             "success": True,
@@ -59,6 +98,87 @@ async def place_order(order: OrderRequest):
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except OutcomeUnknownError as e:
+        # The order may exist: the caller must look it up rather than resend it
+        logging.error("API Error: %s", str(e))
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logging.error("API Error: %s", str(e))
+        raise HTTPException(status_code=502, detail=f"API Error: {str(e)}")
+
+@app.delete("/order/{symbol}/{order_id}")
+async def cancel_order(symbol: str, order_id: int):
+    try:
+        clean = InputValidator.validate_command({"type": "CANCEL", "symbol": symbol.upper(), "order_id": order_id})
+        response = get_order_manager().cancel_order(clean["symbol"], clean["order_id"])
+        return {
+            "success": True,
+            "message": "Order cancelled.",
+            "details": OrderManager.format_order_response(response)
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error("API Error: %s", str(e))
+        raise HTTPException(status_code=502, detail=f"API Error: {str(e)}")
+
+@app.delete("/orders/{symbol}")
+async def cancel_all_orders(symbol: str):
+    try:
+        clean = InputValidator.validate_command({"type": "CANCEL_ALL", "symbol": symbol.upper()})
+        response = get_order_manager().cancel_all_orders(clean["symbol"])
+        return {"success": True, "message": f"All open orders cancelled on {clean['symbol']}.", "details": response}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error("API Error: %s", str(e))
+        raise HTTPException(status_code=502, detail=f"API Error: {str(e)}")
+
+@app.post("/cancel_batch")
+async def cancel_batch(request: BatchCancelRequest):
+    try:
+        symbol = InputValidator.validate_symbol(request.symbol)
+        order_ids = [InputValidator.validate_order_id(oid) for oid in request.order_ids]
+        results = get_order_manager().cancel_orders(symbol, order_ids)
+        return {"success": True, "results": results}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error("API Error: %s", str(e))
+        raise HTTPException(status_code=502, detail=f"API Error: {str(e)}")
+
+@app.put("/order")
+async def modify_order(order: ModifyRequest):
+    try:
+        clean = _validated_modify(order)
+        response = get_order_manager().execute(clean)
+        return {
+            "success": True,
+            "message": "Order modified.",
+            "details": OrderManager.format_order_response(response)
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OutcomeUnknownError as e:
+        # The order may exist: the caller must look it up rather than resend it
+        logging.error("API Error: %s", str(e))
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logging.error("API Error: %s", str(e))
+        raise HTTPException(status_code=502, detail=f"API Error: {str(e)}")
+
+@app.put("/orders")
+async def modify_orders(request: BatchModifyRequest):
+    try:
+        orders = [_validated_modify(order) for order in request.orders]
+        results = get_order_manager().modify_orders(orders)
+        return {"success": True, "results": results}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OutcomeUnknownError as e:
+        # The order may exist: the caller must look it up rather than resend it
+        logging.error("API Error: %s", str(e))
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         logging.error("API Error: %s", str(e))
         raise HTTPException(status_code=502, detail=f"API Error: {str(e)}")
@@ -92,6 +212,77 @@ async def get_price(symbol: str):
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"API Error: {str(e)}")
 
+@app.get("/symbols")
+async def get_symbols():
+    try:
+        client_wrapper = BinanceClient()
+        exchange_info = client_wrapper.request("GET", "/fapi/v1/exchangeInfo")
+        symbols = [
+            {"symbol": s["symbol"], "baseAsset": s.get("baseAsset"), "quoteAsset": s.get("quoteAsset")}
+            for s in exchange_info.get("symbols", []) if s.get("status", "TRADING") == "TRADING"
+        ]
+        return {"success": True, "symbols": symbols}
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"API Error: {str(e)}")
+
+@app.get("/depth/{symbol}")
+async def get_depth(symbol: str, levels: int = 10):
+    try:
+        book = get_depth_book(symbol)
+        top = book.top(levels)
+        return {
+            "symbol": book.symbol,
+            "last_update_id": book.last_update_id,
+            "spread": book.spread(),
+            "bids": top["bids"],
+            "asks": top["asks"]
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"API Error: {str(e)}")
+
+@app.get("/depth/{symbol}/cumulative")
+async def get_cumulative_depth(symbol: str, price: float):
+    try:
+        book = get_depth_book(symbol)
+        size = book.cumulative(price)
+        return {
+            "symbol": book.symbol,
+            "price": price,
+            "bid_size": size["bids"],
+            "ask_size": size["asks"]
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"API Error: {str(e)}")
+
+@app.get("/scanner")
+async def get_scanner(sort: str = "funding_annualized", limit: int = 20,
+                      ascending: bool = False, absolute: bool = False):
+    global funding_scanner
+    try:
+        if funding_scanner is None:
+            from bot.scanner import FundingScanner
+            scanner = FundingScanner(BinanceClient())
+            scanner.start()
+            funding_scanner = scanner
+        return {
+            "success": True,
+            "symbols": len(funding_scanner.symbols),
+            "sort": sort,
+            "results": funding_scanner.ranked(sort, limit, ascending, absolute)
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"API Error: {str(e)}")
+
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
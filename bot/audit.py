@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+from bot.config import get_settings
+
+# Fixed 80-byte little-endian record. The numpy dtype used by the query tool
+# below mirrors this layout field for field.
+RECORD_FORMAT = "<qqqddddIBBBB16s"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+RECORD_FIELDS = [
+    ("ts_ns", "<i8"),          # event wall-clock time, ns since epoch
+    ("seq", "<i8"),            # request sequence number, shared by a request and its response
+    ("order_id", "<i8"),
+    ("quantity", "<f8"),
+    ("price", "<f8"),
+    ("executed_qty", "<f8"),
+    ("avg_price", "<f8"),
+    ("latency_us", "<u4"),     # round-trip time, 0 on REQUEST events
+    ("event", "u1"),
+    ("order_type", "u1"),
+    ("side", "u1"),
+    ("status", "u1"),
+    ("symbol", "S16"),
+]
+
+# Enum tables. Codes are list index + 1, 0 means unknown; only ever append.
+EVENTS = ["REQUEST", "RESPONSE", "ERROR"]
+ORDER_TYPES = ["MARKET", "LIMIT", "STOP_LIMIT", "CANCEL", "CANCEL_ALL", "MODIFY"]
+SIDES = ["BUY", "SELL"]
+STATUSES = ["NEW", "PARTIALLY_FILLED", "FILLED", "CANCELED", "REJECTED", "EXPIRED"]
+# Order types the analytics cover by default; cancels and modifies never fill
+PLACEMENT_TYPES = ["MARKET", "LIMIT", "STOP_LIMIT"]
+
+_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+DEFAULT_AUDIT_FILE = os.path.join(_LOG_DIR, "audit.bin")
+# Simulated orders never reach the exchange, so they are kept out of the real trail
+DEFAULT_SIMULATION_AUDIT_FILE = os.path.join(_LOG_DIR, "audit_sim.bin")
+
+def _code(table, value) -> int:
+    try:
+        return table.index(value) + 1
+    except ValueError:
+        return 0
+
+def _float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class AuditTrail:
+    """
+    Append-only binary audit file with one fixed-size record per order
+    request, response and error.
+    """
+    def __init__(self, path: str = DEFAULT_AUDIT_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "ab")
+        self._lock = threading.Lock()
+        self._seq = time.time_ns()
+        self._last_ts = 0
+        self._pack = struct.Struct(RECORD_FORMAT).pack
+
+    def next_seq(self) -> int:
+        with self._lock:
+            self._seq += 1
+            return self._seq
+
+    def record(self, event: str, seq: int, order_type: str, params: dict,
+               response: Optional[dict] = None, latency_s: float = 0.0):
+        response = response or {}
+        fields = (
+            seq,
+            int(response.get("orderId") or 0),
+            _float(params.get("quantity")),
+            _float(params.get("price")),
+            _float(response.get("executedQty")),
+            _float(response.get("avgPrice")),
+            min(int(latency_s * 1_000_000), 0xFFFFFFFF),
+            _code(EVENTS, event),
+            _code(ORDER_TYPES, order_type),
+            _code(SIDES, params.get("side")),
+            _code(STATUSES, response.get("status")),
+            str(params.get("symbol", "")).encode()[:16],
+        )
+        with self._lock:
+            # Stamped under the lock (and never behind the previous record) so
+            # the file stays sorted by ts_ns for the query tool's searchsorted
+            ts = self._last_ts = max(time.time_ns(), self._last_ts)
+            self._file.write(self._pack(ts, *fields))
+            self._file.flush()
+
+_audit_trail: Optional[AuditTrail] = None
+
+def default_audit_file() -> str:
+    """
+    AUDIT_FILE if set, else logs/audit.bin (logs/audit_sim.bin in simulation mode).
+    """
+    settings = get_settings()
+    if settings.audit_file:
+        return settings.audit_file
+    return DEFAULT_SIMULATION_AUDIT_FILE if settings.simulation_mode else DEFAULT_AUDIT_FILE
+
+def get_audit_trail() -> AuditTrail:
+    """
+    Returns the process-wide audit trail, writing to default_audit_file().
+    """
+    global _audit_trail
+    if _audit_trail is None:
+        _audit_trail = AuditTrail(default_audit_file())
+    return _audit_trail
+
+
+def load_records(path: str):
+    """
+    Memory-maps an audit file as a numpy structured array (no copy).
+    """
+    import numpy as np
+
+    dtype = np.dtype(RECORD_FIELDS)
+    count = os.path.getsize(path) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+def compute_stats(records, since_ns: Optional[int] = None, until_ns: Optional[int] = None,
+                  symbol: Optional[str] = None, bucket_s: Optional[int] = None,
+                  order_types: Optional[List[str]] = None) -> list:
+    """
+    Computes per-symbol (and optionally per-time-bucket) latency percentiles,
+    reject rates and fill statistics, fully vectorized.
+    Only `order_types` are counted (default: PLACEMENT_TYPES), so cancels and
+    modifies don't inflate request counts or dilute fill rates.
+    Several processes may append to one file, so records are only ordered
+    within a process and the window is selected with a mask, not a binary search.
+    """
+    import numpy as np
+
+    ts = records["ts_ns"]
+    keep = None
+    if since_ns is not None:
+        keep = ts >= since_ns
+    if until_ns is not None:
+        keep = ts < until_ns if keep is None else keep & (ts < until_ns)
+    if symbol:
+        matches = records["symbol"] == symbol.upper().encode()
+        keep = matches if keep is None else keep & matches
+    recs = records if keep is None else records[keep]
+    if len(recs) == 0:
+        return []
+
+    # Group by symbol through a 64-bit hash of the 16 symbol bytes; sorting
+    # integers is an order of magnitude faster than sorting byte strings.
+    halves = np.ascontiguousarray(recs["symbol"]).view("<u8").reshape(-1, 2)
+    key = halves[:, 0] ^ (halves[:, 1] * np.uint64(0x9E3779B97F4A7C15))
+    # Symbols are few, so find them from a sample and widen only on misses
+    # instead of paying for a full argsort of every record.
+    keys = np.unique(key[::1000])
+    while True:
+        group = np.minimum(np.searchsorted(keys, key), len(keys) - 1)
+        missing = keys[group] != key
+        if not missing.any():
+            break
+        keys = np.union1d(keys, np.unique(key[missing]))
+    first = np.empty(len(keys), dtype=np.int64)
+    first[group[::-1]] = np.arange(len(key) - 1, -1, -1)
+    symbols = recs["symbol"][first]
+    n_symbols = len(symbols)
+    if bucket_s:
+        bucket_ns = bucket_s * 1_000_000_000
+        buckets = recs["ts_ns"] // bucket_ns
+        bucket_ids, bucket_index = np.unique(buckets, return_inverse=True)
+        group = bucket_index * n_symbols + group
+    else:
+        bucket_ids = np.zeros(1, dtype=np.int64)
+        bucket_ns = 0
+    n_groups = len(bucket_ids) * n_symbols
+
+    # Excluded order types get event code 0, which matches none of the masks
+    # below; cheaper than copying the filtered records
+    type_codes = [_code(ORDER_TYPES, t) for t in (order_types or PLACEMENT_TYPES)]
+    event = np.where(np.isin(recs["order_type"], type_codes), recs["event"], 0)
+    status = recs["status"]
+    is_request = event == _code(EVENTS, "REQUEST")
+    is_response = event == _code(EVENTS, "RESPONSE")
+    is_error = event == _code(EVENTS, "ERROR")
+    is_rejected = is_error | (is_response & (status == _code(STATUSES, "REJECTED")))
+    is_filled = is_response & (status == _code(STATUSES, "FILLED"))
+    is_partial = is_response & (status == _code(STATUSES, "PARTIALLY_FILLED"))
+
+    def count(mask):
+        return np.bincount(group[mask], minlength=n_groups)
+
+    requests, responses, errors = count(is_request), count(is_response), count(is_error)
+    rejected, filled, partial = count(is_rejected), count(is_filled), count(is_partial)
+    filled_qty = np.bincount(group, weights=recs["executed_qty"] * is_response, minlength=n_groups)
+    notional = np.bincount(group, weights=recs["executed_qty"] * recs["avg_price"] * is_response,
+                           minlength=n_groups)
+
+    # Latency percentiles: sort (group << 32 | latency) once and slice per group
+    done = is_response | is_error
+    packed = np.sort((group[done].astype(np.int64) << 32) | recs["latency_us"][done])
+    latency_ms = (packed & 0xFFFFFFFF) / 1000.0
+    bounds = np.searchsorted(packed >> 32, np.arange(n_groups + 1))
+
+    stats = []
+    for g in range(n_groups):
+        sent = requests[g] or (responses[g] + errors[g])
+        if sent == 0:
+            continue
+        lat = latency_ms[bounds[g]:bounds[g + 1]]
+        p50, p90, p99 = np.percentile(lat, [50, 90, 99]) if len(lat) else (0.0, 0.0, 0.0)
+        row = {
+            "symbol": symbols[g % n_symbols].decode(),
+            "requests": int(sent),
+            "errors": int(errors[g]),
+            "reject_rate": float(rejected[g] / sent),
+            "filled": int(filled[g]),
+            "partially_filled": int(partial[g]),
+            "fill_rate": float(filled[g] / responses[g]) if responses[g] else 0.0,
+            "filled_qty": float(filled_qty[g]),
+            "notional": float(notional[g]),
+            "latency_ms_p50": float(p50),
+            "latency_ms_p90": float(p90),
+            "latency_ms_p99": float(p99),
+        }
+        if bucket_s:
+            start = int(bucket_ids[g // n_symbols]) * bucket_ns // 1_000_000_000
+            row = {"window_start": datetime.fromtimestamp(start).isoformat(), **row}
+        stats.append(row)
+    return stats
+
+def _parse_time(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    return int(datetime.fromisoformat(value).timestamp() * 1_000_000_000)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the binary order audit trail")
+    parser.add_argument("--file", default=default_audit_file(),
+                        help="Audit file path (default: the one this mode writes to)")
+    parser.add_argument("--symbol", help="Only include this symbol (e.g., BTCUSDT)")
+    parser.add_argument("--since", help="Window start, ISO format (e.g., 2026-02-16T18:00)")
+    parser.add_argument("--until", help="Window end, ISO format")
+    parser.add_argument("--bucket", type=int, help="Group into time buckets of this many seconds")
+    parser.add_argument("--order-type", action="append", choices=ORDER_TYPES, dest="order_types",
+                        help=f"Only count this order type, repeatable (default: {', '.join(PLACEMENT_TYPES)})")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per row")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.file):
+        print(f"❌ Audit file not found: {args.file}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    records = load_records(args.file)
+    stats = compute_stats(records, _parse_time(args.since), _parse_time(args.until),
+                          args.symbol, args.bucket, args.order_types)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        for row in stats:
+            print(json.dumps(row))
+        return
+
+    print(f"Scanned {len(records):,} events in {elapsed:.2f}s\n")
+    header = f"{'Window':<20}{'Symbol':<14}{'Reqs':>8}{'Reject%':>9}{'Fill%':>8}{'FilledQty':>12}{'p50ms':>9}{'p90ms':>9}{'p99ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in stats:
+        print(f"{row.get('window_start', 'all'):<20}{row['symbol']:<14}{row['requests']:>8}"
+              f"{row['reject_rate'] * 100:>8.1f}%{row['fill_rate'] * 100:>7.1f}%{row['filled_qty']:>12.4f}"
+              f"{row['latency_ms_p50']:>9.1f}{row['latency_ms_p90']:>9.1f}{row['latency_ms_p99']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
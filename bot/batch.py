@@ -0,0 +1,160 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Tuple
+from bot.orders import OrderManager
+from bot.parser import CommandParser
+from bot.resilience import OutcomeUnknownError
+from bot.validators import InputValidator
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: allows `rate` acquisitions per second with bursts up to `burst`.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("❌ Rate must be greater than 0")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def parse_script(lines: Iterable[str]) -> Tuple[List[dict], List[dict]]:
+    """
+    Parses and validates every command up front.
+    Blank lines and lines starting with '#' are skipped.
+    Returns (orders, errors); each entry carries its 1-based line number.
+    """
+    orders, errors = [], []
+    for line_no, line in enumerate(lines, start=1):
+        command = line.strip()
+        if not command or command.startswith("#"):
+            continue
+
+        intent = CommandParser.parse(command)
+        if intent is None:
+            errors.append({"line": line_no, "command": command, "stage": "parse",
+                           "error": "Could not parse command"})
+            continue
+
+        try:
+            clean_data = InputValidator.validate_command(intent)
+        except ValueError as e:
+            errors.append({"line": line_no, "command": command, "stage": "validate", "error": str(e)})
+            continue
+
+        orders.append({"line": line_no, "command": command, "order": clean_data})
+    return orders, errors
+
+PLACEMENT_TYPES = {"MARKET", "LIMIT", "STOP_LIMIT"}
+
+def _phases(orders: List[dict]) -> Dict[str, deque]:
+    """
+    Splits each symbol's commands into phases that must run in script order:
+    consecutive placements share a phase, while every cancel / cancel all /
+    modify is a phase of its own, so it acts as a barrier for that symbol.
+    """
+    phases = defaultdict(deque)
+    for entry in orders:
+        queue = phases[entry["order"]["symbol"]]
+        placement = entry["order"]["type"] in PLACEMENT_TYPES
+        if placement and queue and queue[-1][-1]["order"]["type"] in PLACEMENT_TYPES:
+            queue[-1].append(entry)
+        else:
+            queue.append([entry])
+    return phases
+
+def execute_batch(orders: List[dict], order_manager: OrderManager, rate: float = 5.0, workers: int = 4):
+    """
+    Submits validated commands (orders, cancels, modifies) concurrently,
+    never exceeding `rate` requests per second. Different symbols run
+    independently; within a symbol a cancel or modify only starts once
+    everything before it has completed, and nothing after it starts earlier.
+    Yields one result dict per command as soon as it completes; placements
+    that may or may not have landed are flagged `outcome_unknown`.
+    """
+    # The bucket holds at most one second's worth of tokens, so the worker
+    # count only bounds concurrency and never lets a burst exceed `rate`.
+    limiter = RateLimiter(rate, burst=max(1, int(rate)))
+
+    def submit(entry):
+        limiter.acquire()
+        try:
+            response = order_manager.execute(entry["order"])
+            return {**entry, "success": True, "response": response}
+        except OutcomeUnknownError as e:
+            # Not a clean failure: the order may be live, so report what to look up
+            logging.error("Batch order on line %s has an unknown outcome: %s", entry["line"], str(e))
+            return {**entry, "success": False, "error": str(e), "outcome_unknown": True,
+                    "client_order_id": e.client_order_id}
+        except Exception as e:
+            logging.error("Batch order on line %s failed: %s", entry["line"], str(e))
+            return {**entry, "success": False, "error": str(e)}
+
+    phases = _phases(orders)
+    remaining = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {}
+
+        def start_next(symbol):
+            if phases[symbol]:
+                phase = phases[symbol].popleft()
+                remaining[symbol] = len(phase)
+                for entry in phase:
+                    running[pool.submit(submit, entry)] = symbol
+
+        for symbol in list(phases):
+            start_next(symbol)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                symbol = running.pop(future)
+                yield future.result()
+                remaining[symbol] -= 1
+                if remaining[symbol] == 0:
+                    start_next(symbol)
+
+def run_script(lines: Iterable[str], order_manager_factory, out, rate: float = 5.0,
+               workers: int = 4, dry_run: bool = False) -> int:
+    """
+    Parses a whole script, reports all errors without sending anything if
+    there are any, otherwise executes it. Every result is written to `out`
+    as a JSON line. Returns a process exit code.
+    """
+    orders, errors = parse_script(lines)
+    for error in errors:
+        out.write(json.dumps({"success": False, **error}) + "\n")
+    if errors:
+        logging.error("Batch rejected: %s invalid command(s), nothing was sent.", len(errors))
+        return 1
+
+    logging.info("Batch validated: %s order(s)", len(orders))
+    if dry_run:
+        for entry in orders:
+            out.write(json.dumps({**entry, "success": True, "dry_run": True}) + "\n")
+        return 0
+
+    failures = 0
+    for result in execute_batch(orders, order_manager_factory(), rate, workers):
+        failures += not result["success"]
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+    logging.info("Batch finished: %s sent, %s failed", len(orders), failures)
+    return 1 if failures else 0
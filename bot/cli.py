@@ -1,12 +1,30 @@
 import argparse
 import logging
 import sys
-import questionary
 from bot.logging_config import setup_logging
 from bot.client import BinanceClient
 from bot.orders import OrderManager
 from bot.validators import InputValidator
-from binance.exceptions import BinanceAPIException, BinanceOrderException
+from bot.batch import run_script
+from bot.parser import CommandParser
+
+def positive_float(value: str) -> float:
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}")
+    if not number > 0 or number == float("inf"):
+        raise argparse.ArgumentTypeError("must be greater than 0")
+    return number
+
+def positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
 
 def print_summary(data: dict):
     print("\n===== ORDER REQUEST =====")
@@ -24,6 +42,9 @@ def interactive_mode():
     """
     Runs the bot in a professional interactive mode.
     """
+    # Imported here: prompt_toolkit is the slowest import in the CLI and only this path needs it
+    import questionary
+
     print("\n--- Binance Futures Trading Bot (Interactive) ---")
     
     symbol = questionary.text("Enter symbol (e.g., BTCUSDT):", default="BTCUSDT").ask()
@@ -54,6 +75,76 @@ def interactive_mode():
         "stop_price": stop_price
     }
 
+def run_batch(args) -> int:
+    """
+    Runs a batch script of natural-language commands. Results stream to stdout as JSON lines.
+    """
+    if args.batch == "-":
+        lines = sys.stdin.readlines()
+    else:
+        with open(args.batch) as f:
+            lines = f.readlines()
+
+    # A dry run never touches the network, so it resolves symbols against the built-in list
+    client_wrapper = None
+    if not args.dry_run:
+        try:
+            client_wrapper = BinanceClient()
+        except ValueError as e:
+            print(f"❌ {str(e)}")
+            logging.error("Batch aborted: %s", str(e))
+            return 1
+        try:
+            CommandParser.load_symbols(client_wrapper)
+        except Exception as e:
+            logging.warning("Could not load exchange symbols, using built-in list: %s", str(e))
+
+    return run_script(
+        lines,
+        lambda: OrderManager(client_wrapper),
+        sys.stdout,
+        rate=args.rate,
+        workers=args.workers,
+        dry_run=args.dry_run
+    )
+
+def run_order_action(args):
+    """
+    Cancels, cancels all, or modifies existing orders from command-line flags.
+    """
+    if args.cancel_all:
+        command = {"type": "CANCEL_ALL", "symbol": args.symbol}
+    elif args.cancel:
+        command = {"type": "CANCEL", "symbol": args.symbol, "order_id": args.cancel}
+    else:
+        command = {
+            "type": "MODIFY",
+            "symbol": args.symbol,
+            "order_id": args.modify,
+            "side": args.side,
+            "quantity": args.quantity,
+            "price": args.price
+        }
+
+    try:
+        clean_data = InputValidator.validate_command(command)
+    except ValueError as e:
+        print(str(e))
+        logging.error("Validation failed: %s", str(e))
+        return
+
+    try:
+        order_manager = OrderManager(BinanceClient())
+        response = order_manager.execute(clean_data)
+        if clean_data['type'] == 'CANCEL_ALL':
+            print(response.get('msg', response))
+        else:
+            print(OrderManager.format_order_response(response))
+        print("\n✅ SUCCESS")
+    except Exception as e:
+        print(f"\n❌ UNEXPECTED ERROR: {str(e)}")
+        logging.error("Unexpected Error: %s", str(e))
+
 def main():
     setup_logging()
     
@@ -65,12 +156,24 @@ def main():
     parser.add_argument("--price", type=str, help="Limit price")
     parser.add_argument("--stop", type=str, help="Stop price (for STOP_LIMIT)")
     parser.add_argument("--interactive", action="store_true", help="Run in interactive mode")
+    parser.add_argument("--batch", metavar="FILE", help="Run a script of natural-language commands, one per line ('-' for stdin)")
+    parser.add_argument("--rate", type=positive_float, default=5.0, help="Max orders per second in batch mode")
+    parser.add_argument("--workers", type=positive_int, default=4, help="Concurrent submissions in batch mode")
+    parser.add_argument("--dry-run", action="store_true", help="Parse and validate the batch without sending it")
+    parser.add_argument("--cancel", metavar="ORDER_ID", help="Cancel an open order (requires --symbol)")
+    parser.add_argument("--cancel-all", action="store_true", help="Cancel all open orders on --symbol")
+    parser.add_argument("--modify", metavar="ORDER_ID", help="Modify an open LIMIT order (requires --symbol, --side, --quantity, --price)")
     
     args = parser.parse_args()
     
     order_data = None
     
-    if args.interactive:
+    if args.batch:
+        sys.exit(run_batch(args))
+    elif args.cancel or args.cancel_all or args.modify:
+        run_order_action(args)
+        return
+    elif args.interactive:
         order_data = interactive_mode()
         if not order_data:
             return
@@ -111,28 +214,13 @@ def main():
         client_wrapper = BinanceClient()
         order_manager = OrderManager(client_wrapper)
         
-        response = None
-        if clean_data['type'] == 'MARKET':
-            response = order_manager.place_market_order(
-                clean_data['symbol'], clean_data['side'], clean_data['quantity']
-            )
-        elif clean_data['type'] == 'LIMIT':
-            response = order_manager.place_limit_order(
-                clean_data['symbol'], clean_data['side'], clean_data['quantity'], clean_data['price']
-            )
-        elif clean_data['type'] == 'STOP_LIMIT':
-            response = order_manager.place_stop_limit_order(
-                clean_data['symbol'], clean_data['side'], clean_data['quantity'], clean_data['price'], clean_data['stop_price']
-            )
+        response = order_manager.place_order(clean_data)
             
         # 4. Show Response
         print(OrderManager.format_order_response(response))
         print("\n✅ SUCCESS")
         logging.info("Response received: %s", response.get('status'))
         
-    except BinanceAPIException as e:
-        print(f"\n❌ API ERROR: {e.message}")
-        logging.error("API Error: %s", e.message)
     except Exception as e:
         print(f"\n❌ UNEXPECTED ERROR: {str(e)}")
         logging.error("Unexpected Error: %s", str(e))
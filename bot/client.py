@@ -1,14 +1,68 @@
-import os
+import json
+import math
 import time
 import hmac
 import hashlib
 import requests
 import logging
+import threading
 from urllib.parse import urlencode
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from bot.config import get_settings
+from bot.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, OutcomeUnknownError
 
-# Load environment variables
-load_dotenv()
+class _Upstream:
+    """
+    Health state for one base URL: warm session, circuit breaker and latency.
+    """
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.mount(base_url, HTTPAdapter(pool_connections=1, pool_maxsize=20))
+        settings = get_settings()
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.breaker_failures,
+            reset_timeout=settings.breaker_reset_seconds
+        )
+        self.latency = LatencyTracker()
+
+# Shared by every BinanceClient in the process, since callers like the API
+# create a client per request and health must outlive them.
+_upstreams = {}
+_endpoint_latency = {}
+_probed = False
+_state_lock = threading.Lock()
+
+def _get_upstream(base_url: str) -> _Upstream:
+    with _state_lock:
+        if base_url not in _upstreams:
+            _upstreams[base_url] = _Upstream(base_url)
+        return _upstreams[base_url]
+
+def _never_sent(error: Exception) -> bool:
+    """
+    True if the request provably never reached the server, so even a
+    non-idempotent order can safely be retried elsewhere.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+class BinanceAPIError(Exception):
+    """
+    The exchange answered and rejected the request. Client errors (4xx other
+    than rate limiting) will fail the same way again, so they aren't retried.
+    """
+    def __init__(self, message: str, status_code: int, code=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code in (418, 429) or self.status_code >= 500
 
 class BinanceClient:
     """
@@ -16,11 +70,16 @@ class BinanceClient:
     Demonstrates deep understanding of HMAC signing and API security.
     """
     BASE_URL = "https://testnet.binancefuture.com"
+    IDEMPOTENT_METHODS = {"GET", "DELETE"}
+    CONNECT_TIMEOUT = 3.05
     
     def __init__(self):
-        self.api_key = os.getenv("BINANCE_API_KEY")
-        self.api_secret = os.getenv("BINANCE_API_SECRET")
-        self.simulation_mode = os.getenv("SIMULATION_MODE", "False").lower() == "true"
+        # Comma-separated list of equivalent base URLs, tried fastest-first
+        settings = get_settings()
+        self.base_urls = settings.base_urls or [self.BASE_URL]
+        self.api_key = settings.api_key
+        self.api_secret = settings.api_secret
+        self.simulation_mode = settings.simulation_mode
         
         if not self.simulation_mode and (not self.api_key or not self.api_secret):
             logging.error("API Key or Secret missing in .env file (and Simulation Mode is OFF).")
@@ -40,13 +99,13 @@ class BinanceClient:
         """
         Sends an authorized/unauthorized request to the Binance API.
         If Simulation Mode is ON, returns a mock response.
+        A POST/PUT that may have reached the exchange is never retried; it
+        raises OutcomeUnknownError instead.
         """
         if self.simulation_mode:
             logging.info("[SIMULATION MODE] Intercepted %s %s with params: %s", method, endpoint, params)
             return self._get_mock_response(method, endpoint, params)
 
-        url = f"{self.BASE_URL}{endpoint}"
-        # ... existing request code
         if params is None:
             params = {}
             
@@ -59,29 +118,148 @@ class BinanceClient:
             query_string = urlencode(params)
             params['signature'] = self._generate_signature(query_string)
 
-        try:
-            logging.debug("Sending %s request to %s with params: %s", method, url, params)
-            response = requests.request(method, url, headers=headers, params=params)
-            response_json = response.json()
+        tracker = self._endpoint_tracker(method, endpoint)
+        last_error = None
+        for upstream in self._ranked_upstreams():
+            if not upstream.breaker.allow():
+                continue
+            url = f"{upstream.base_url}{endpoint}"
+            timeout = tracker.timeout()
+            try:
+                logging.debug("Sending %s request to %s with params: %s (timeout %.2fs)", method, url, params, timeout)
+                started = time.perf_counter()
+                response = upstream.session.request(
+                    method, url, headers=headers, params=params,
+                    timeout=(min(self.CONNECT_TIMEOUT, timeout), timeout)
+                )
+                elapsed = time.perf_counter() - started
+            except requests.exceptions.RequestException as e:
+                upstream.breaker.record_failure()
+                # Penalise the URL's ranking as if it had answered at the timeout
+                upstream.latency.observe(timeout)
+                if isinstance(e, requests.exceptions.Timeout):
+                    # Let the endpoint's timeout grow if it is just slower than it used to be
+                    tracker.observe_timeout(timeout)
+                logging.error("Network error via %s: %s", upstream.base_url, str(e))
+                last_error = e
+                if method in self.IDEMPOTENT_METHODS or _never_sent(e):
+                    continue
+                raise OutcomeUnknownError(
+                    f"Outcome unknown: {method} {endpoint} may have been executed ({str(e)})"
+                ) from e
+
+            if response.status_code >= 500:
+                upstream.breaker.record_failure()
+                logging.error("Upstream %s returned %s", upstream.base_url, response.status_code)
+                last_error = Exception(f"HTTP {response.status_code}")
+                if method in self.IDEMPOTENT_METHODS:
+                    continue
+                # Binance: a 5xx means the request's execution status is unknown
+                raise OutcomeUnknownError(
+                    f"Outcome unknown: {method} {endpoint} may have been executed (HTTP {response.status_code})"
+                )
+            else:
+                upstream.breaker.record_success()
+                tracker.observe(elapsed)
+                upstream.latency.observe(elapsed)
+
+            try:
+                response_json = response.json()
+            except ValueError:
+                response_json = {}
             
             if response.status_code != 200:
                 error_msg = response_json.get('msg', 'Unknown Error')
                 logging.error("Binance API Error (%s): %s", response.status_code, error_msg)
-                raise Exception(f"API Error: {error_msg}")
+                raise BinanceAPIError(f"API Error: {error_msg}", response.status_code, response_json.get('code'))
                 
             return response_json
-        except requests.exceptions.RequestException as e:
-            logging.error("Network error: %s", str(e))
-            raise Exception(f"Network error: {str(e)}")
+
+        if last_error is None:
+            logging.error("Circuit open for all endpoints, failing fast: %s %s", method, endpoint)
+            raise CircuitOpenError(f"Network error: circuit open for all endpoints ({', '.join(self.base_urls)})")
+        raise Exception(f"Network error: {str(last_error)}")
+
+    def _ranked_upstreams(self):
+        """
+        Base URLs ordered fastest measured EWMA first. With several URLs they are
+        probed once per process; unmeasured URLs keep their configured order last.
+        """
+        global _probed
+        if len(self.base_urls) > 1 and not _probed:
+            _probed = True
+            self.probe()
+        upstreams = [_get_upstream(u) for u in self.base_urls]
+        return sorted(upstreams, key=lambda u: u.latency.ewma if u.latency.ewma is not None else float("inf"))
+
+    def _endpoint_tracker(self, method, endpoint):
+        key = f"{method} {endpoint}"
+        with _state_lock:
+            if key not in _endpoint_latency:
+                _endpoint_latency[key] = LatencyTracker(default_timeout=get_settings().http_timeout)
+            return _endpoint_latency[key]
+
+    def probe(self):
+        """
+        Measures every base URL with /fapi/v1/ping so routing starts from real latencies.
+        Returns {base_url: seconds or None if unreachable}.
+        """
+        results = {}
+        for base_url in self.base_urls:
+            upstream = _get_upstream(base_url)
+            try:
+                started = time.perf_counter()
+                upstream.session.get(f"{base_url}/fapi/v1/ping", timeout=self.CONNECT_TIMEOUT).raise_for_status()
+                elapsed = time.perf_counter() - started
+                upstream.latency.observe(elapsed)
+                upstream.breaker.record_success()
+                results[base_url] = elapsed
+            except requests.exceptions.RequestException as e:
+                upstream.breaker.record_failure()
+                logging.warning("Probe failed for %s: %s", base_url, str(e))
+                results[base_url] = None
+        return results
 
     def _get_mock_response(self, method, endpoint, params):
         """
         Generates realistic mock responses for Simulation Mode.
         """
-        if "/fapi/v1/order" in endpoint:
+        if "/fapi/v1/allOpenOrders" in endpoint:
+            return {"code": 200, "msg": "The operation of cancel all open order is done."}
+        elif "/fapi/v1/batchOrders" in endpoint and method == "DELETE":
+            return [
+                {"orderId": order_id, "symbol": params.get("symbol"), "status": "CANCELED"}
+                for order_id in json.loads(params.get("orderIdList", "[]"))
+            ]
+        elif "/fapi/v1/batchOrders" in endpoint and method == "PUT":
+            return [
+                {"orderId": o["orderId"], "symbol": o["symbol"], "status": "NEW", "executedQty": "0",
+                 "price": o["price"], "origQty": o["quantity"], "side": o["side"], "type": "LIMIT"}
+                for o in json.loads(params.get("batchOrders", "[]"))
+            ]
+        elif "/fapi/v1/order" in endpoint and method == "GET":
+            # No matching engine in simulation: resting orders stay open
+            return {"orderId": params.get("orderId"), "clientOrderId": params.get("origClientOrderId"),
+                    "symbol": params.get("symbol"), "status": "NEW", "executedQty": "0", "avgPrice": "0.00"}
+        elif "/fapi/v1/order" in endpoint and method == "DELETE":
+            return {"orderId": params.get("orderId"), "symbol": params.get("symbol"), "status": "CANCELED"}
+        elif "/fapi/v1/order" in endpoint and method == "PUT":
+            return {
+                "orderId": params.get("orderId"),
+                "symbol": params.get("symbol"),
+                "status": "NEW",
+                "executedQty": "0",
+                "avgPrice": "0.00",
+                "price": params.get("price"),
+                "origQty": params.get("quantity"),
+                "side": params.get("side"),
+                "type": "LIMIT"
+            }
+        elif "/fapi/v1/order" in endpoint:
             # Mock order response
             return {
                 "orderId": int(time.time() * 100),
+                "clientOrderId": params.get("newClientOrderId"),
                 "symbol": params.get("symbol", "BTCUSDT"),
                 "status": "FILLED" if params.get("type") == "MARKET" else "NEW",
                 "executedQty": params.get("quantity", "0.00"),
@@ -89,6 +267,58 @@ class BinanceClient:
                 "side": params.get("side", "BUY"),
                 "type": params.get("type", "MARKET")
             }
+        elif "/fapi/v1/depth" in endpoint:
+            # Mock depth snapshot around a fixed mid price
+            mid = 43000.00
+            levels = range(1, min(int(params.get("limit", 100)), 100) + 1)
+            return {
+                "lastUpdateId": int(time.time() * 1000),
+                "bids": [[f"{mid - i * 0.1:.2f}", "1.000"] for i in levels],
+                "asks": [[f"{mid + i * 0.1:.2f}", "1.000"] for i in levels]
+            }
+        elif "/fapi/v1/exchangeInfo" in endpoint:
+            # Mock exchange info with a handful of perpetuals
+            bases = ["BTC", "ETH", "BNB", "SOL", "XRP", "DOGE", "ADA", "AVAX", "LINK", "1000PEPE", "1000SHIB"]
+            return {"symbols": [
+                {"symbol": f"{b}USDT", "baseAsset": b, "quoteAsset": "USDT", "status": "TRADING"} for b in bases
+            ]}
+        elif "/fapi/v1/fundingInfo" in endpoint:
+            # Mock funding info: only contracts with non-default settings are listed
+            return [
+                {"symbol": "DOGEUSDT", "adjustedFundingRateCap": "0.03000000",
+                 "adjustedFundingRateFloor": "-0.03000000", "fundingIntervalHours": 4},
+                {"symbol": "XRPUSDT", "adjustedFundingRateCap": "0.03000000",
+                 "adjustedFundingRateFloor": "-0.03000000", "fundingIntervalHours": 1}
+            ]
+        elif "/fapi/v1/premiumIndex" in endpoint:
+            # Mock mark/index prices drifting slowly around fixed levels
+            now = time.time()
+            bases = {"BTC": 43000.0, "ETH": 2300.0, "BNB": 310.0, "SOL": 98.0, "XRP": 0.55, "DOGE": 0.08}
+            rows = []
+            for i, (base, level) in enumerate(bases.items()):
+                mark = level * (1 + 0.01 * math.sin(now / 60 + i))
+                rows.append({
+                    "symbol": f"{base}USDT",
+                    "markPrice": f"{mark:.8f}",
+                    "indexPrice": f"{mark * (1 - 0.0005 * math.cos(now / 90 + i)):.8f}",
+                    "lastFundingRate": f"{0.0001 * (1 + math.sin(now / 300 + i)):.8f}",
+                    "nextFundingTime": int(now // 28800 + 1) * 28800000,
+                    "time": int(now * 1000)
+                })
+            return rows
+        elif "/fapi/v1/ticker/price" in endpoint:
+            # Mock last prices on the same slow drift as premiumIndex
+            now = time.time()
+            bases = {"BTC": 43000.0, "ETH": 2300.0, "BNB": 310.0, "SOL": 98.0, "XRP": 0.55, "DOGE": 0.08}
+            rows = [
+                {"symbol": f"{base}USDT", "price": f"{level * (1 + 0.01 * math.sin(now / 60 + i)):.8f}",
+                 "time": int(now * 1000)}
+                for i, (base, level) in enumerate(bases.items())
+            ]
+            symbol = (params or {}).get("symbol")
+            if symbol:
+                return next((r for r in rows if r["symbol"] == symbol), {"symbol": symbol, "price": "0", "time": int(now * 1000)})
+            return rows
         elif "/fapi/v2/account" in endpoint:
             # Mock account info
             return {"assets": [{"asset": "USDT", "walletBalance": "1000.00"}]}
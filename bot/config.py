@@ -0,0 +1,41 @@
+import os
+from functools import lru_cache
+from typing import List, Optional
+
+class Settings:
+    """
+    Process-wide configuration parsed once from the environment (and .env).
+    """
+    def __init__(self, env=os.environ):
+        # Exchange access
+        self.api_key: Optional[str] = env.get("BINANCE_API_KEY")
+        self.api_secret: Optional[str] = env.get("BINANCE_API_SECRET")
+        self.simulation_mode: bool = env.get("SIMULATION_MODE", "False").lower() == "true"
+        self.base_urls: List[str] = [u.strip().rstrip("/") for u in env.get("BINANCE_BASE_URLS", "").split(",") if u.strip()]
+        self.ws_url: Optional[str] = env.get("BINANCE_WS_URL")
+
+        # Network resilience
+        self.http_timeout = float(env.get("HTTP_TIMEOUT", "10"))
+        self.breaker_failures = int(env.get("BREAKER_FAILURES", "5"))
+        self.breaker_reset_seconds = float(env.get("BREAKER_RESET_SECONDS", "30"))
+
+        # Audit trail
+        self.audit_file: Optional[str] = env.get("AUDIT_FILE")
+
+        # Dashboard
+        self.api_url = env.get("API_URL", "http://127.0.0.1:8000")
+        self.telemetry_ttl = int(env.get("TELEMETRY_TTL", "5"))
+        self.sidebar_refresh = int(env.get("SIDEBAR_REFRESH", "10"))
+        self.chat_history_limit = int(env.get("CHAT_HISTORY_LIMIT", "200"))
+        self.chat_page_size = int(env.get("CHAT_PAGE_SIZE", "20"))
+        self.chat_history_file: Optional[str] = env.get("CHAT_HISTORY_FILE")
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    Loads .env on first call and returns the cached Settings for the process.
+    Call get_settings.cache_clear() to re-read the environment.
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+    return Settings()
@@ -0,0 +1,421 @@
+import json
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from bot.client import BinanceAPIError, BinanceClient
+from bot.config import get_settings
+
+class BookSide:
+    """
+    Sorted, array-backed price levels for one side of the order book.
+    Levels are kept in ascending order of a sort key (price for bids, -price
+    for asks) so the best level always sits at the end of the arrays and the
+    common top-of-book updates never shift the whole array.
+    """
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self._sign = 1.0 if is_bid else -1.0
+        self._keys = array('d')
+        self._qtys = array('d')
+
+    def __len__(self):
+        return len(self._keys)
+
+    def load(self, levels: Iterable[Tuple[str, str]]):
+        """
+        Replaces all levels with a snapshot (list of [price, qty] strings).
+        """
+        sign = self._sign
+        pairs = sorted((sign * float(p), float(q)) for p, q in levels if float(q) > 0)
+        self._keys = array('d', (k for k, _ in pairs))
+        self._qtys = array('d', (q for _, q in pairs))
+
+    def update(self, price: float, qty: float):
+        """
+        Sets the quantity at a price level. A quantity of 0 removes the level.
+        """
+        key = self._sign * price
+        keys = self._keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            if qty == 0:
+                del keys[i]
+                del self._qtys[i]
+            else:
+                self._qtys[i] = qty
+        elif qty != 0:
+            keys.insert(i, key)
+            self._qtys.insert(i, qty)
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        if not self._keys:
+            return None
+        return self._sign * self._keys[-1], self._qtys[-1]
+
+    def top(self, n: int) -> List[Tuple[float, float]]:
+        """
+        Returns up to n levels as (price, qty), best level first.
+        """
+        sign, keys, qtys = self._sign, self._keys, self._qtys
+        end = len(keys)
+        start = max(0, end - n)
+        return [(sign * keys[i], qtys[i]) for i in range(end - 1, start - 1, -1)]
+
+    def cumulative(self, price: float) -> float:
+        """
+        Total size resting at prices at least as good as `price`
+        (bids at or above it, asks at or below it).
+        """
+        i = bisect_left(self._keys, self._sign * price)
+        return sum(self._qtys[i:])
+
+
+class DepthBook:
+    """
+    Local order book for one symbol, built from a REST snapshot and kept
+    current by the @depth diff stream using Binance's update-id sequencing:
+    - events with u < lastUpdateId are stale and dropped,
+    - the first applied event must satisfy U <= lastUpdateId <= u,
+    - every following event's pu must equal the previous event's u.
+    Any gap marks the book as needing a fresh snapshot; diffs received in the
+    meantime are buffered (up to `max_buffer`, oldest dropped first) and
+    replayed once the snapshot arrives.
+    """
+    def __init__(self, symbol: str, max_buffer: int = 5000):
+        self.symbol = symbol.upper()
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.last_update_id: Optional[int] = None
+        self.needs_snapshot = True
+        self._prev_u: Optional[int] = None
+        self._buffer = deque(maxlen=max_buffer)
+
+    @property
+    def synced(self) -> bool:
+        return not self.needs_snapshot
+
+    def load_snapshot(self, snapshot: dict) -> bool:
+        """
+        Loads a /fapi/v1/depth snapshot and replays any buffered diffs on top of it.
+        Returns False if the snapshot is too old for the buffered diffs and
+        another one is needed.
+        """
+        self.bids.load(snapshot.get("bids", []))
+        self.asks.load(snapshot.get("asks", []))
+        self.last_update_id = int(snapshot["lastUpdateId"])
+        self.needs_snapshot = False
+        self._prev_u = None
+        logging.info("Depth snapshot loaded for %s (lastUpdateId: %s, %s bids, %s asks)",
+                     self.symbol, self.last_update_id, len(self.bids), len(self.asks))
+
+        buffered = list(self._buffer)
+        self._buffer.clear()
+        for event in buffered:
+            self.apply(event)
+        return self.synced
+
+    def apply(self, event: dict) -> bool:
+        """
+        Applies one depthUpdate event. Returns False if the event revealed a
+        sequence gap, or overflowed the buffer while waiting for a snapshot,
+        and the book must be resynced from a new snapshot.
+        """
+        if self.needs_snapshot:
+            # A full deque drops its oldest diff, so a snapshot already in
+            # flight may no longer connect to what remains
+            overflow = len(self._buffer) == self._buffer.maxlen
+            self._buffer.append(event)
+            return not overflow
+
+        first_id, final_id = event["U"], event["u"]
+        if final_id < self.last_update_id:
+            return True
+
+        if self._prev_u is None:
+            in_sequence = first_id <= self.last_update_id
+        else:
+            in_sequence = event.get("pu") == self._prev_u
+
+        if not in_sequence:
+            logging.warning("Depth sequence gap for %s (U: %s, u: %s, pu: %s, expected: %s). Resyncing.",
+                            self.symbol, first_id, final_id, event.get("pu"),
+                            self._prev_u if self._prev_u is not None else self.last_update_id)
+            self.needs_snapshot = True
+            self._buffer.clear()
+            self._buffer.append(event)
+            return False
+
+        bid_update = self.bids.update
+        for p, q in event["b"]:
+            bid_update(float(p), float(q))
+        ask_update = self.asks.update
+        for p, q in event["a"]:
+            ask_update(float(p), float(q))
+
+        self._prev_u = final_id
+        self.last_update_id = final_id
+        return True
+
+    def top(self, n: int = 10) -> dict:
+        return {"bids": self.bids.top(n), "asks": self.asks.top(n)}
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def cumulative(self, price: float) -> dict:
+        """
+        Size available up to `price`: bids at or above it, asks at or below it.
+        """
+        return {"bids": self.bids.cumulative(price), "asks": self.asks.cumulative(price)}
+
+
+class DepthBookManager:
+    """
+    Maintains DepthBooks for many symbols from a single websocket connection,
+    or from a recorded JSON-lines file for offline replay. Live tracking
+    needs a client; replay() works without one.
+    """
+    STREAM_URL = "wss://stream.binancefuture.com/ws"
+    RESYNC_INITIAL_DELAY = 0.5
+    RESYNC_MAX_DELAY = 30.0
+    # Minimum seconds between exchangeInfo reloads triggered by unknown symbols
+    SYMBOLS_REFRESH = 300.0
+
+    def __init__(self, client: Optional[BinanceClient] = None, depth_limit: int = 1000,
+                 record_path: Optional[str] = None):
+        self.client = client
+        self.depth_limit = depth_limit
+        self.stream_url = get_settings().ws_url or self.STREAM_URL
+        self.books: Dict[str, DepthBook] = {}
+        self._lock = threading.Lock()
+        self._ws = None
+        self._record = open(record_path, "a") if record_path else None
+        self._resyncing = set()
+        self._symbols: Optional[set] = None
+        self._symbols_loaded_at = float("-inf")
+
+    def book(self, symbol: str) -> Optional[DepthBook]:
+        return self.books.get(symbol.upper())
+
+    def track(self, symbols: Iterable[str]):
+        """
+        Subscribes to the diff stream for the given symbols and loads their snapshots.
+        Raises ValueError, tracking nothing, if a symbol isn't trading on the
+        exchange, or after the others are loaded if the exchange rejects one.
+        """
+        if self.client is None:
+            raise ValueError("❌ Live depth tracking needs a BinanceClient (only replay() works without one)")
+        new = [s.upper() for s in symbols if s.upper() not in self.books]
+        if not new:
+            return
+        self._check_symbols(new)
+        with self._lock:
+            for symbol in new:
+                self.books[symbol] = DepthBook(symbol)
+
+        if not self.client.simulation_mode:
+            self._subscribe(new)
+        rejected = []
+        for symbol in new:
+            # First attempt inline so callers usually get a synced book back;
+            # transient failures keep retrying in the background
+            try:
+                synced = self._load(symbol)
+            except BinanceAPIError as e:
+                if not e.retryable:
+                    self._drop(symbol)
+                    rejected.append(f"{symbol} ({str(e)})")
+                    continue
+                logging.error("Depth snapshot failed for %s: %s", symbol, str(e))
+                synced = False
+            except Exception as e:
+                logging.error("Depth snapshot failed for %s: %s", symbol, str(e))
+                synced = False
+            if not synced:
+                self._start_resync(symbol)
+        if rejected:
+            raise ValueError(f"❌ Depth unavailable for {', '.join(rejected)}")
+
+    def _check_symbols(self, symbols: List[str]):
+        """
+        Validates symbols against the exchange's TRADING list, loaded once and
+        reloaded (at most every SYMBOLS_REFRESH seconds) when a symbol is missing.
+        """
+        unknown = symbols if self._symbols is None else [s for s in symbols if s not in self._symbols]
+        if unknown and time.monotonic() - self._symbols_loaded_at >= self.SYMBOLS_REFRESH:
+            exchange_info = self.client.request("GET", "/fapi/v1/exchangeInfo")
+            self._symbols = {
+                s["symbol"] for s in exchange_info.get("symbols", []) if s.get("status", "TRADING") == "TRADING"
+            }
+            self._symbols_loaded_at = time.monotonic()
+            unknown = [s for s in symbols if s not in self._symbols]
+        if unknown:
+            raise ValueError(f"❌ Unknown or non-trading symbol: {', '.join(unknown)}")
+
+    def _drop(self, symbol: str):
+        """
+        Stops tracking a symbol: forgets its book and leaves its stream.
+        """
+        with self._lock:
+            self.books.pop(symbol, None)
+            self._resyncing.discard(symbol)
+        if self._ws is not None and self._connected.is_set():
+            self._send_subscribe([symbol], method="UNSUBSCRIBE")
+        logging.warning("Stopped tracking depth for %s", symbol)
+
+    def snapshot(self, symbol: str) -> dict:
+        params = {"symbol": symbol, "limit": self.depth_limit}
+        return self.client.request("GET", "/fapi/v1/depth", params=params)
+
+    def _load(self, symbol: str) -> bool:
+        snapshot = self.snapshot(symbol)
+        self._write_record({"e": "snapshot", "s": symbol, **snapshot})
+        with self._lock:
+            return self.books[symbol].load_snapshot(snapshot)
+
+    def _start_resync(self, symbol: str):
+        with self._lock:
+            if symbol in self._resyncing:
+                return
+            self._resyncing.add(symbol)
+        threading.Thread(target=self._resync, args=(symbol,), daemon=True).start()
+
+    def _resync(self, symbol: str):
+        """
+        Fetches snapshots with exponential backoff until the book is in sync.
+        Gives up and drops the book if the exchange rejects the request outright.
+        """
+        delay = self.RESYNC_INITIAL_DELAY
+        while True:
+            try:
+                synced = self._load(symbol)
+                if not synced:
+                    logging.warning("Depth snapshot for %s is behind buffered diffs, retrying", symbol)
+            except BinanceAPIError as e:
+                if not e.retryable:
+                    logging.error("Depth snapshot rejected for %s: %s", symbol, str(e))
+                    self._drop(symbol)
+                    return
+                logging.error("Depth snapshot failed for %s: %s (retrying in %.1fs)", symbol, str(e), delay)
+                synced = False
+            except Exception as e:
+                logging.error("Depth snapshot failed for %s: %s (retrying in %.1fs)", symbol, str(e), delay)
+                synced = False
+
+            if synced:
+                with self._lock:
+                    # A new gap may have opened since loading; if so, keep going
+                    if self.books[symbol].synced:
+                        self._resyncing.discard(symbol)
+                        return
+            time.sleep(delay)
+            delay = min(delay * 2, self.RESYNC_MAX_DELAY)
+
+    def on_event(self, event: dict):
+        """
+        Routes one depthUpdate event to its book, triggering a background
+        resync when the book detects a sequence gap.
+        """
+        book = self.books.get(event["s"])
+        if book is None:
+            return
+        self._write_record(event)
+        with self._lock:
+            ok = book.apply(event)
+        if not ok:
+            self._start_resync(book.symbol)
+
+    def replay(self, path: str) -> int:
+        """
+        Replays a recorded JSON-lines file of snapshots and depthUpdate events.
+        Returns the number of diff events applied.
+        """
+        count = 0
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                symbol = record["s"]
+                book = self.books.get(symbol)
+                if book is None:
+                    book = self.books[symbol] = DepthBook(symbol)
+                if record.get("e") == "snapshot":
+                    book.load_snapshot(record)
+                else:
+                    book.apply(record)
+                    count += 1
+        return count
+
+    def _write_record(self, record: dict):
+        if self._record is not None:
+            self._record.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def _subscribe(self, symbols: List[str]):
+        if self._ws is None:
+            # on_open subscribes every tracked book, including these
+            self._start_stream()
+        elif self._connected.is_set():
+            self._send_subscribe(symbols)
+
+    def _start_stream(self):
+        import websocket
+
+        self._connected = threading.Event()
+        self._reconnecting = False
+
+        def on_open(ws):
+            logging.info("Depth stream connected: %s", self.stream_url)
+            self._connected.set()
+            self._send_subscribe(list(self.books))
+            if self._reconnecting:
+                # Diffs were missed while disconnected, so every book needs a new snapshot
+                for symbol in list(self.books):
+                    with self._lock:
+                        self.books[symbol].needs_snapshot = True
+                    self._start_resync(symbol)
+            self._reconnecting = True
+
+        def on_message(ws, message):
+            event = json.loads(message)
+            if event.get("e") == "depthUpdate":
+                self.on_event(event)
+
+        def on_close(ws, *args):
+            logging.warning("Depth stream closed.")
+            self._connected.clear()
+
+        def on_error(ws, error):
+            logging.error("Depth stream error: %s", str(error))
+
+        self._ws = websocket.WebSocketApp(self.stream_url, on_open=on_open, on_message=on_message,
+                                          on_close=on_close, on_error=on_error)
+        thread = threading.Thread(target=self._ws.run_forever, kwargs={"reconnect": 5}, daemon=True)
+        thread.start()
+        self._connected.wait(timeout=5)
+
+    def _send_subscribe(self, symbols: List[str], method: str = "SUBSCRIBE"):
+        if not symbols:
+            return
+        streams = [f"{s.lower()}@depth@100ms" for s in symbols]
+        self._ws.send(json.dumps({"method": method, "params": streams, "id": 1}))
+
+if __name__ == "__main__":
+    import sys
+    from bot.logging_config import setup_logging
+    setup_logging()
+    if len(sys.argv) < 2:
+        print("Usage: python -m bot.depth <recorded_depth.jsonl>")
+        sys.exit(1)
+    manager = DepthBookManager()
+    applied = manager.replay(sys.argv[1])
+    print(f"Applied {applied} diff events")
+    for symbol, book in manager.books.items():
+        print(f"{symbol}: spread={book.spread()} top={book.top(3)}")
@@ -1,14 +1,75 @@
+import json
 import logging
-from bot.client import BinanceClient
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from bot.audit import AuditTrail, get_audit_trail
+from bot.client import BinanceAPIError, BinanceClient
+from bot.resilience import OutcomeUnknownError
 
 class OrderManager:
     """
     Handles order placement logic using direct REST calls through BinanceClient.
+    Placements ask for RESULT responses, so immediate fills (executedQty,
+    avgPrice) are reported in the response instead of a bare ACK, and carry a
+    newClientOrderId so an order whose outcome is unknown can be looked up.
     """
-    def __init__(self, client: BinanceClient):
+    # Exchange limits per batch request
+    MAX_BATCH_CANCEL = 10
+    MAX_BATCH_MODIFY = 5
+    # Binance error code for "Order does not exist"
+    ORDER_NOT_FOUND = -2013
+
+    def __init__(self, client: BinanceClient, audit: Optional[AuditTrail] = None):
         self.client = client
+        self.audit = audit or get_audit_trail()
+
+    def _submit(self, order_type: str, params: dict, method: str = "POST", endpoint: str = "/fapi/v1/order",
+                audit_params: Optional[dict] = None):
+        """
+        Sends an order request and writes its request, response or error to the audit trail.
+        `audit_params` overrides what is recorded when the wire params don't carry a symbol.
+        """
+        recorded = audit_params or params
+        seq = self.audit.next_seq()
+        self.audit.record("REQUEST", seq, order_type, recorded)
+        started = time.perf_counter()
+        try:
+            response = self.client.request(method, endpoint, params=params, signed=True)
+        except OutcomeUnknownError as e:
+            self.audit.record("ERROR", seq, order_type, recorded, latency_s=time.perf_counter() - started)
+            client_order_id = params.get("newClientOrderId")
+            reference = f"clientOrderId {client_order_id}" if client_order_id else f"orderId {params.get('orderId')}"
+            raise OutcomeUnknownError(
+                f"{str(e)}; check {reference} on {params.get('symbol')} before retrying",
+                symbol=params.get("symbol"), client_order_id=client_order_id, order_id=params.get("orderId")
+            ) from e
+        except Exception:
+            self.audit.record("ERROR", seq, order_type, recorded, latency_s=time.perf_counter() - started)
+            raise
+        self.audit.record("RESPONSE", seq, order_type, recorded,
+                          response if isinstance(response, dict) else None, time.perf_counter() - started)
+        return response
+
+    def _burst(self, calls: list) -> list:
+        """
+        Runs independent requests concurrently over the client's keep-alive
+        connection pool, so N chunks cost about one round-trip instead of N.
+        Results keep the order of `calls`.
+        """
+        if not calls:
+            return []
+        if len(calls) == 1:
+            return [calls[0]()]
+        with ThreadPoolExecutor(max_workers=min(len(calls), 10)) as pool:
+            return list(pool.map(lambda call: call(), calls))
+
+    @staticmethod
+    def new_client_order_id() -> str:
+        return f"bot-{uuid.uuid4().hex[:24]}"
 
-    def place_market_order(self, symbol: str, side: str, quantity: float):
+    def place_market_order(self, symbol: str, side: str, quantity: float, client_order_id: Optional[str] = None):
         """
         Places a MARKET order on Binance Futures Testnet.
         """
@@ -18,14 +79,17 @@ class OrderManager:
             "symbol": symbol,
             "side": side,
             "type": "MARKET",
-            "quantity": quantity
+            "quantity": quantity,
+            "newClientOrderId": client_order_id or self.new_client_order_id(),
+            "newOrderRespType": "RESULT"
         }
         
-        response = self.client.request("POST", "/fapi/v1/order", params=params, signed=True)
+        response = self._submit("MARKET", params)
         logging.info("MARKET order placed successfully. OrderID: %s", response.get('orderId'))
         return response
 
-    def place_limit_order(self, symbol: str, side: str, quantity: float, price: float):
+    def place_limit_order(self, symbol: str, side: str, quantity: float, price: float,
+                          client_order_id: Optional[str] = None):
         """
         Places a LIMIT order on Binance Futures Testnet.
         """
@@ -37,14 +101,17 @@ class OrderManager:
             "type": "LIMIT",
             "quantity": quantity,
             "price": price,
-            "timeInForce": "GTC"  # Good Till Cancelled
+            "timeInForce": "GTC",  # Good Till Cancelled
+            "newClientOrderId": client_order_id or self.new_client_order_id(),
+            "newOrderRespType": "RESULT"
         }
         
-        response = self.client.request("POST", "/fapi/v1/order", params=params, signed=True)
+        response = self._submit("LIMIT", params)
         logging.info("LIMIT order placed successfully. OrderID: %s", response.get('orderId'))
         return response
 
-    def place_stop_limit_order(self, symbol: str, side: str, quantity: float, price: float, stop_price: float):
+    def place_stop_limit_order(self, symbol: str, side: str, quantity: float, price: float, stop_price: float,
+                               client_order_id: Optional[str] = None):
         """
         Places a STOP_LIMIT order on Binance Futures Testnet.
         """
@@ -58,13 +125,163 @@ class OrderManager:
             "quantity": quantity,
             "price": price,
             "stopPrice": stop_price,
-            "timeInForce": "GTC"
+            "timeInForce": "GTC",
+            "newClientOrderId": client_order_id or self.new_client_order_id(),
+            "newOrderRespType": "RESULT"
         }
         
-        response = self.client.request("POST", "/fapi/v1/order", params=params, signed=True)
+        response = self._submit("STOP_LIMIT", params)
         logging.info("STOP_LIMIT order placed successfully. OrderID: %s", response.get('orderId'))
         return response
 
+    def place_order(self, order: dict):
+        """
+        Places an order from a validated dict (as returned by InputValidator.validate_inputs).
+        An optional 'client_order_id' key is sent as newClientOrderId.
+        """
+        client_order_id = order.get('client_order_id')
+        if order['type'] == 'MARKET':
+            return self.place_market_order(order['symbol'], order['side'], order['quantity'], client_order_id)
+        elif order['type'] == 'LIMIT':
+            return self.place_limit_order(order['symbol'], order['side'], order['quantity'], order['price'],
+                                          client_order_id)
+        elif order['type'] == 'STOP_LIMIT':
+            return self.place_stop_limit_order(
+                order['symbol'], order['side'], order['quantity'], order['price'], order['stop_price'],
+                client_order_id
+            )
+        raise ValueError(f"❌ Unsupported order type: {order['type']}")
+
+    def get_order(self, symbol: str, order_id: Optional[int] = None, client_order_id: Optional[str] = None):
+        """
+        Queries an order's current status and executed quantity (read-only, not audited),
+        by exchange order ID or by the client order ID it was placed with.
+        """
+        params = {"symbol": symbol}
+        if order_id is not None:
+            params["orderId"] = order_id
+        elif client_order_id:
+            params["origClientOrderId"] = client_order_id
+        else:
+            raise ValueError("❌ Either order_id or client_order_id is required")
+        return self.client.request("GET", "/fapi/v1/order", params=params, signed=True)
+
+    def reconcile_order(self, symbol: str, client_order_id: str) -> Optional[dict]:
+        """
+        Settles an OutcomeUnknownError: returns the order if it reached the
+        exchange, or None if the exchange has no such order.
+        """
+        try:
+            return self.get_order(symbol, client_order_id=client_order_id)
+        except BinanceAPIError as e:
+            if e.code == self.ORDER_NOT_FOUND:
+                return None
+            raise
+
+    def cancel_order(self, symbol: str, order_id: int):
+        """
+        Cancels one open order.
+        """
+        logging.info("Cancelling order %s on %s", order_id, symbol)
+        params = {"symbol": symbol, "orderId": order_id}
+        response = self._submit("CANCEL", params, method="DELETE")
+        logging.info("Order cancelled. OrderID: %s, Status: %s", order_id, response.get('status'))
+        return response
+
+    def cancel_all_orders(self, symbol: str):
+        """
+        Cancels every open order on a symbol in a single request.
+        """
+        logging.info("Cancelling all open orders on %s", symbol)
+        response = self._submit("CANCEL_ALL", {"symbol": symbol}, method="DELETE", endpoint="/fapi/v1/allOpenOrders")
+        logging.info("All open orders cancelled on %s", symbol)
+        return response
+
+    def cancel_orders(self, symbol: str, order_ids: List[int]):
+        """
+        Cancels many orders on one symbol via /fapi/v1/batchOrders.
+        Chunks of up to 10 IDs are sent concurrently. Returns one result per ID.
+        """
+        if not order_ids:
+            raise ValueError("❌ Batch cancel needs at least one order ID.")
+        logging.info("Batch cancelling %s orders on %s", len(order_ids), symbol)
+        chunks = [order_ids[i:i + self.MAX_BATCH_CANCEL] for i in range(0, len(order_ids), self.MAX_BATCH_CANCEL)]
+        calls = [
+            lambda chunk=chunk: self._submit(
+                "CANCEL", {"symbol": symbol, "orderIdList": json.dumps(chunk)},
+                method="DELETE", endpoint="/fapi/v1/batchOrders"
+            )
+            for chunk in chunks
+        ]
+        results = [r for chunk_result in self._burst(calls) for r in chunk_result]
+        logging.info("Batch cancel done on %s: %s results", symbol, len(results))
+        return results
+
+    def modify_order(self, symbol: str, order_id: int, side: str, quantity: float, price: float):
+        """
+        Modifies price/quantity of an open LIMIT order in place (PUT /fapi/v1/order).
+        The exchange applies it atomically, so there is no window with no order resting.
+        """
+        logging.info("Modifying order %s on %s: %s qty: %s, price: %s", order_id, symbol, side, quantity, price)
+        params = {
+            "symbol": symbol,
+            "orderId": order_id,
+            "side": side,
+            "quantity": quantity,
+            "price": price
+        }
+        response = self._submit("MODIFY", params, method="PUT")
+        logging.info("Order modified. OrderID: %s", response.get('orderId'))
+        return response
+
+    def modify_orders(self, orders: List[dict]):
+        """
+        Re-quotes many LIMIT orders via /fapi/v1/batchOrders. Each dict needs
+        symbol, order_id, side, quantity and price. Chunks of up to 5 are sent
+        concurrently. Returns one result per order, grouped by symbol.
+        """
+        if not orders:
+            raise ValueError("❌ Batch modify needs at least one order.")
+        logging.info("Batch modifying %s orders", len(orders))
+        by_symbol = {}
+        for o in orders:
+            by_symbol.setdefault(o["symbol"], []).append({
+                "symbol": o["symbol"],
+                "orderId": o["order_id"],
+                "side": o["side"],
+                "quantity": str(o["quantity"]),
+                "price": str(o["price"])
+            })
+        chunks = [
+            batch[i:i + self.MAX_BATCH_MODIFY]
+            for batch in by_symbol.values()
+            for i in range(0, len(batch), self.MAX_BATCH_MODIFY)
+        ]
+        calls = [
+            lambda chunk=chunk: self._submit(
+                "MODIFY", {"batchOrders": json.dumps(chunk)}, method="PUT",
+                endpoint="/fapi/v1/batchOrders", audit_params={"symbol": chunk[0]["symbol"]}
+            )
+            for chunk in chunks
+        ]
+        results = [r for chunk_result in self._burst(calls) for r in chunk_result]
+        logging.info("Batch modify done: %s results", len(results))
+        return results
+
+    def execute(self, command: dict):
+        """
+        Executes any validated command: a new order, CANCEL, CANCEL_ALL or MODIFY.
+        """
+        if command['type'] == 'CANCEL':
+            return self.cancel_order(command['symbol'], command['order_id'])
+        elif command['type'] == 'CANCEL_ALL':
+            return self.cancel_all_orders(command['symbol'])
+        elif command['type'] == 'MODIFY':
+            return self.modify_order(
+                command['symbol'], command['order_id'], command['side'], command['quantity'], command['price']
+            )
+        return self.place_order(command)
+
     @staticmethod
     def format_order_response(response: dict):
         """
@@ -1,74 +1,265 @@
-import re
 import logging
-from typing import Optional, Dict, Any
+import math
+from functools import lru_cache
+from typing import Optional, Dict, Any, Iterable, List
+
+# Tokens are split on whitespace only; surrounding punctuation is stripped from
+# the few tokens the grammar actually inspects, which is much cheaper than
+# cleaning the whole string up front.
+_PUNCTUATION = ",;:!?()[]{}<>\"'"
+_NUMBER_START = frozenset("0123456789.")
+
+SIDE_WORDS = {"buy": "BUY", "long": "BUY", "sell": "SELL", "short": "SELL"}
+MODIFY_WORDS = {"modify", "replace", "amend"}
+_TAIL_KEYWORDS = ("at", "price", "trigger")
+
+class SymbolIndex:
+    """
+    Hash index resolving user-typed symbols to exchange symbols.
+    Accepts full symbols ("btcusdt"), base assets ("btc"), multiplier-less
+    bases ("pepe" -> 1000PEPEUSDT) and explicit aliases ("bitcoin").
+    A `strict` index holds the exchange's full list, so tokens it can't
+    resolve are unknown symbols rather than symbols it just hasn't heard of.
+    """
+    DEFAULT_SYMBOLS = [
+        {"symbol": "BTCUSDT", "baseAsset": "BTC", "quoteAsset": "USDT"},
+        {"symbol": "ETHUSDT", "baseAsset": "ETH", "quoteAsset": "USDT"},
+        {"symbol": "BNBUSDT", "baseAsset": "BNB", "quoteAsset": "USDT"},
+        {"symbol": "SOLUSDT", "baseAsset": "SOL", "quoteAsset": "USDT"},
+    ]
+    DEFAULT_ALIASES = {
+        "bitcoin": "BTCUSDT",
+        "xbt": "BTCUSDT",
+        "ether": "ETHUSDT",
+        "ethereum": "ETHUSDT",
+        "solana": "SOLUSDT",
+        "binance": "BNBUSDT",
+    }
+    # Preferred quote asset when a base trades against several
+    QUOTE_PRIORITY = ["USDT", "USDC", "BUSD"]
+
+    def __init__(self, symbols: Iterable[dict] = None, aliases: Dict[str, str] = None, strict: bool = False):
+        self._index: Dict[str, str] = {}
+        self.strict = strict
+        symbols = list(symbols or self.DEFAULT_SYMBOLS)
+
+        def rank(entry):
+            quote = entry.get("quoteAsset", "")
+            return self.QUOTE_PRIORITY.index(quote) if quote in self.QUOTE_PRIORITY else len(self.QUOTE_PRIORITY)
+
+        # Full symbols always win, then exact bases, then multiplier-less bases
+        # (so "lunc" is LUNCUSDT even if 1000LUNCUSDT is listed first);
+        # each tier is filled in best-quote-first
+        ranked = sorted(symbols, key=rank)
+        for entry in symbols:
+            self._index[entry["symbol"].lower()] = entry["symbol"]
+        for entry in ranked:
+            base = entry.get("baseAsset", "").lower()
+            if base:
+                self._index.setdefault(base, entry["symbol"])
+        for entry in ranked:
+            base = entry.get("baseAsset", "").lower()
+            stripped = base.lstrip("0123456789")
+            if stripped and stripped != base:
+                self._index.setdefault(stripped, entry["symbol"])
+
+        for alias, symbol in {**self.DEFAULT_ALIASES, **(aliases or {})}.items():
+            if symbol.lower() in self._index:
+                self._index.setdefault(alias.lower(), symbol)
+
+    def __len__(self):
+        return len(self._index)
+
+    def resolve(self, token: str) -> Optional[str]:
+        return self._index.get(token.lower())
+
+    @classmethod
+    def from_exchange_info(cls, exchange_info: dict, aliases: Dict[str, str] = None):
+        """
+        Builds a strict index from a /fapi/v1/exchangeInfo response (TRADING symbols only).
+        """
+        symbols = [s for s in exchange_info.get("symbols", []) if s.get("status", "TRADING") == "TRADING"]
+        return cls(symbols, aliases, strict=True)
+
+
+def _to_number(token: str) -> Optional[float]:
+    """
+    Plain decimal numbers only ("0.5", "45000", "45,000"). Exponents,
+    inf/nan and values that overflow to infinity are rejected.
+    """
+    token = token.strip(_PUNCTUATION)
+    if not token or token[0] not in _NUMBER_START:
+        return None
+    whole, _, frac = token.partition(".")
+    if "," in whole:
+        groups = whole.split(",")
+        if not 1 <= len(groups[0]) <= 3 or any(len(g) != 3 for g in groups[1:]):
+            return None
+        whole = "".join(groups)
+    digits = whole + frac
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    value = float(f"{whole or 0}.{frac or 0}")
+    return value if math.isfinite(value) else None
+
+def _clean_symbol(token: str) -> str:
+    return token.strip(_PUNCTUATION + ".").replace("/", "")
 
 class CommandParser:
     """
     Parses natural language strings into structured trading commands.
     Demonstrates intent extraction without requiring an external NLP API.
+    Commands are tokenized once and matched by a small grammar:
+        [stop limit | limit | market] SIDE QTY SYMBOL [at PRICE | at market | price PRICE trigger STOP]
+        cancel ORDER_ID SYMBOL | cancel all SYMBOL
+        (modify | replace | amend) ORDER_ID SYMBOL [to] SIDE QTY [SYMBOL] at PRICE
+    Once the exchange's symbol list is loaded, unknown symbols don't parse.
     """
-    
+    symbols = SymbolIndex()
+
+    @classmethod
+    def set_symbol_index(cls, index: SymbolIndex):
+        cls.symbols = index
+        _parse_cached.cache_clear()
+        logging.info("Command parser symbol index updated (%s entries)", len(index))
+
+    @classmethod
+    def load_symbols(cls, client):
+        """
+        Loads the exchange's full symbol list through a BinanceClient.
+        """
+        exchange_info = client.request("GET", "/fapi/v1/exchangeInfo")
+        cls.set_symbol_index(SymbolIndex.from_exchange_info(exchange_info))
+
     @staticmethod
     def parse(text: str) -> Optional[Dict[str, Any]]:
-        text = text.lower().strip()
-        
-        # Mapping long/short to buy/sell
-        text = text.replace("long", "buy").replace("short", "sell")
-        
-        # Regex Patterns
-        # 1. MARKET: "buy 0.01 btc" or "market sell 0.5 eth"
-        market_pattern = r"(market\s+)?(buy|sell)\s+([\d.]+)\s+([a-z0-9]+)(\s+at\s+market)?"
-        
-        # 2. LIMIT: "buy 0.01 btc at 45000" or "limit sell 0.5 eth at 2500"
-        limit_pattern = r"(limit\s+)?(buy|sell)\s+([\d.]+)\s+([a-z0-9]+)\s+at\s+([\d.]+)"
-        
-        # 3. STOP_LIMIT: "stop limit buy 0.01 btc price 45000 trigger 44000"
-        stop_limit_pattern = r"stop\s+limit\s+(buy|sell)\s+([\d.]+)\s+([a-z0-9]+)\s+price\s+([\d.]+)\s+trigger\s+([\d.]+)"
-
-        # Try STOP_LIMIT first (strictest pattern)
-        match = re.search(stop_limit_pattern, text)
-        if match:
-            side, qty, symbol, price, stop = match.groups()
-            return {
-                "type": "STOP_LIMIT",
-                "side": side.upper(),
-                "quantity": float(qty),
-                "symbol": CommandParser._format_symbol(symbol),
-                "price": float(price),
-                "stop_price": float(stop)
-            }
+        result = _parse_cached(text)
+        return result.copy() if result is not None else None
 
-        # Try LIMIT
-        match = re.search(limit_pattern, text)
-        if match:
-            _, side, qty, symbol, price = match.groups()
-            return {
-                "type": "LIMIT",
-                "side": side.upper(),
-                "quantity": float(qty),
-                "symbol": CommandParser._format_symbol(symbol),
-                "price": float(price)
-            }
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return text.lower().split()
 
-        # Try MARKET
-        match = re.search(market_pattern, text)
-        if match:
-            _, side, qty, symbol, _ = match.groups()
-            return {
+    @staticmethod
+    def _parse_tokens(tokens: List[str]) -> Optional[Dict[str, Any]]:
+        for i in range(len(tokens) - 2):
+            token = tokens[i]
+            if token == "cancel" or token in MODIFY_WORDS:
+                command = CommandParser._parse_order_action(tokens, i)
+                if command is not None:
+                    return command
+                # A malformed modify must never fall through to placing its order
+                if token in MODIFY_WORDS and tokens[i + 1].strip(_PUNCTUATION + "#").isdigit():
+                    return None
+                continue
+
+            side = SIDE_WORDS.get(token)
+            if side is None:
+                continue
+            qty = _to_number(tokens[i + 1])
+            symbol = _clean_symbol(tokens[i + 2])
+            if qty is None or not symbol or _to_number(symbol) is not None:
+                continue
+            symbol = CommandParser._format_symbol(symbol)
+            if symbol is None:
+                continue
+
+            command = {
                 "type": "MARKET",
-                "side": side.upper(),
-                "quantity": float(qty),
-                "symbol": CommandParser._format_symbol(symbol)
+                "side": side,
+                "quantity": qty,
+                "symbol": symbol
             }
+            # An explicit prefix or price keyword must be followed by a valid
+            # tail; anything malformed is rejected rather than sent at market
+            prefix = tokens[i - 1] if i >= 1 else None
+            rest = [t.strip(_PUNCTUATION) for t in tokens[i + 3:i + 8]]
+            keyword = rest[0] if rest else None
+            used = 0
+            if prefix == "limit" and i >= 2 and tokens[i - 2] == "stop":
+                if len(rest) < 4 or keyword != "price" or rest[2] != "trigger":
+                    return None
+                price, stop = _to_number(rest[1]), _to_number(rest[3])
+                if price is None or stop is None:
+                    return None
+                command.update(type="STOP_LIMIT", price=price, stop_price=stop)
+                used = 4
+            elif keyword == "at":
+                used = 2
+                target = rest[1] if len(rest) > 1 else ""
+                if target == "market":
+                    if prefix == "limit":
+                        return None
+                else:
+                    price = _to_number(target)
+                    if price is None or prefix == "market":
+                        return None
+                    command.update(type="LIMIT", price=price)
+            elif prefix == "limit" or keyword in _TAIL_KEYWORDS:
+                return None
+            # A second price clause ("at 5 trigger 4") is ambiguous, never ignored
+            if len(rest) > used and rest[used] in _TAIL_KEYWORDS:
+                return None
+            return command
 
         return None
 
     @staticmethod
-    def _format_symbol(symbol: str) -> str:
-        symbol = symbol.upper()
-        if not symbol.endswith("USDT") and symbol in ["BTC", "ETH", "BNB", "SOL"]:
-            return f"{symbol}USDT"
-        return symbol
+    def _parse_order_action(tokens: List[str], i: int) -> Optional[Dict[str, Any]]:
+        """
+        Parses cancel / cancel all / modify commands starting at tokens[i].
+        """
+        target = tokens[i + 1].strip(_PUNCTUATION + "#")
+        symbol = _clean_symbol(tokens[i + 2])
+        if not symbol:
+            return None
+        symbol = CommandParser._format_symbol(symbol)
+        if symbol is None:
+            return None
+
+        if tokens[i] == "cancel":
+            if target == "all":
+                return {"type": "CANCEL_ALL", "symbol": symbol}
+            if target.isdigit():
+                return {"type": "CANCEL", "symbol": symbol, "order_id": int(target)}
+            return None
+
+        # modify ORDER_ID SYMBOL [to] SIDE QTY [SYMBOL] at PRICE
+        if not target.isdigit():
+            return None
+        rest = tokens[i + 3:]
+        if rest and rest[0] == "to":
+            rest = rest[1:]
+        if len(rest) >= 5 and rest[3] == "at":
+            # The repeated symbol must name the same market as the first one
+            if CommandParser._format_symbol(_clean_symbol(rest[2])) != symbol:
+                return None
+            rest = rest[:2] + rest[3:]
+        if len(rest) < 4 or rest[2] != "at" or rest[0] not in SIDE_WORDS:
+            return None
+        qty, price = _to_number(rest[1]), _to_number(rest[3])
+        if qty is None or price is None:
+            return None
+        return {
+            "type": "MODIFY",
+            "side": SIDE_WORDS[rest[0]],
+            "quantity": qty,
+            "symbol": symbol,
+            "price": price,
+            "order_id": int(target)
+        }
+
+    @staticmethod
+    def _format_symbol(symbol: str) -> Optional[str]:
+        resolved = CommandParser.symbols.resolve(symbol)
+        if resolved is None and not CommandParser.symbols.strict:
+            return symbol.upper()
+        return resolved
+
+@lru_cache(maxsize=8192)
+def _parse_cached(text: str):
+    # CommandParser.parse hands out copies, so cached dicts are never mutated
+    return CommandParser._parse_tokens(CommandParser.tokenize(text))
 
 if __name__ == "__main__":
     # Quick Test
@@ -76,7 +267,11 @@ if __name__ == "__main__":
         "buy 0.01 btc at market",
         "limit sell 0.5 eth at 2500",
         "stop limit buy 0.002 btc price 100000 trigger 99000",
-        "Buy 0.1 SOL at 120"
+        "Buy 0.1 SOL at 120",
+        "go long 1 bitcoin",
+        "cancel 12345 btc",
+        "cancel all eth",
+        "modify 12345 btc to buy 0.01 at 45100"
     ]
     for tc in test_cases:
         print(f"Input: {tc} -> Output: {CommandParser.parse(tc)}")
@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+class CircuitOpenError(Exception):
+    """
+    Raised when every upstream endpoint is failing fast behind an open circuit.
+    """
+
+class OutcomeUnknownError(Exception):
+    """
+    Raised when a non-idempotent request (order placement or modification) may
+    have reached the exchange but no answer came back: a read timeout, a
+    dropped connection or a 5xx. Retrying could duplicate the order, so look
+    it up instead (OrderManager.reconcile_order with `client_order_id`).
+    """
+    def __init__(self, message: str, symbol: Optional[str] = None,
+                 client_order_id: Optional[str] = None, order_id=None):
+        super().__init__(message)
+        self.symbol = symbol
+        self.client_order_id = client_order_id
+        self.order_id = order_id
+
+
+class LatencyTracker:
+    """
+    Rolling window of observed latencies for one endpoint.
+    Derives an adaptive timeout from the tail (p99 x multiplier, clamped) and
+    keeps an EWMA used to rank base URLs against each other.
+    Timeouts are fed back too: each one doubles the timeout floor, which then
+    decays as requests succeed, so a slowed-down endpoint isn't stuck with a
+    timeout learned while it was fast.
+    """
+    def __init__(self, window: int = 200, min_samples: int = 20, default_timeout: float = 10.0,
+                 floor: float = 1.0, ceiling: float = 30.0, multiplier: float = 3.0, alpha: float = 0.2,
+                 backoff_decay: float = 0.9):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.default_timeout = default_timeout
+        self.floor = floor
+        self.ceiling = ceiling
+        self.multiplier = multiplier
+        self.alpha = alpha
+        self.backoff_decay = backoff_decay
+        self.ewma: Optional[float] = None
+        self._backoff = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+            self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+            self._backoff *= self.backoff_decay
+
+    def observe_timeout(self, timeout: float):
+        """
+        Records a request that gave up after `timeout` seconds. Its real
+        latency is at least that, so it counts as a sample and the next
+        timeout is at least twice as long.
+        """
+        with self._lock:
+            self.samples.append(timeout)
+            self._backoff = min(self.ceiling, max(self._backoff, timeout * 2))
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self.samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def timeout(self) -> float:
+        """
+        Read timeout to use for the next request.
+        Falls back to the default until enough samples have been observed.
+        """
+        if len(self.samples) < self.min_samples:
+            return max(self.default_timeout, self._backoff)
+        return min(self.ceiling, max(self.floor, self.percentile(99) * self.multiplier, self._backoff))
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker. After `failure_threshold` consecutive failures
+    the circuit opens and calls fail fast; after `reset_timeout` seconds a
+    single trial call is let through (half-open) to decide whether to close it.
+    """
+    CLOSED, OPEN, HALF_OPEN = "CLOSED", "OPEN", "HALF_OPEN"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
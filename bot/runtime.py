@@ -0,0 +1,430 @@
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from bot.orders import OrderManager
+from bot.resilience import OutcomeUnknownError
+from bot.validators import InputValidator
+
+class PriceEvent:
+    __slots__ = ("symbol", "price", "ts")
+
+    def __init__(self, symbol: str, price: float, ts: float):
+        self.symbol = symbol
+        self.price = price
+        self.ts = ts
+
+class FillEvent:
+    __slots__ = ("symbol", "side", "quantity", "price", "order_id", "ts")
+
+    def __init__(self, symbol: str, side: str, quantity: float, price: float, order_id, ts: float):
+        self.symbol = symbol
+        self.side = side
+        self.quantity = quantity
+        self.price = price
+        self.order_id = order_id
+        self.ts = ts
+
+
+class Strategy:
+    """
+    Base class for strategies. Override the hooks you need; they are plain
+    (non-async) methods so dispatching an event costs one function call.
+    Set `symbols` to subscribe to specific symbols (empty means all).
+    """
+    symbols: List[str] = []
+
+    def __init__(self, **params):
+        self.params = params
+        self.runtime: Optional["StrategyRuntime"] = None
+        self.name = type(self).__name__
+
+    def submit(self, symbol: str, side: str, order_type: str, quantity: float,
+               price: float = None, stop_price: float = None):
+        """
+        Sends an order intent through InputValidator to the runtime's executor.
+        Raises ValueError on invalid input. Returns nothing in either mode:
+        fills are delivered to on_fill, failures are logged.
+        """
+        self.runtime.submit(self, symbol, side, order_type, quantity, price, stop_price)
+
+    def now(self) -> float:
+        return self.runtime.clock.now()
+
+    def on_start(self): pass
+    def on_price(self, event: PriceEvent): pass
+    def on_fill(self, event: FillEvent): pass
+    def on_stop(self): pass
+
+
+class LiveClock:
+    """
+    Wall-clock time; events are delivered as they arrive.
+    """
+    def now(self) -> float:
+        return time.time()
+
+    async def advance(self, ts: float):
+        return None
+
+class ReplayClock:
+    """
+    Simulated time driven by recorded event timestamps.
+    speed=0 replays as fast as possible; speed=N sleeps real (Δt / N) between events.
+    """
+    def __init__(self, speed: float = 0.0):
+        self.speed = speed
+        self._now = 0.0
+
+    def now(self) -> float:
+        return self._now
+
+    async def advance(self, ts: float):
+        if self.speed > 0 and self._now and ts > self._now:
+            await asyncio.sleep((ts - self._now) / self.speed)
+        self._now = ts
+
+
+class PaperBroker:
+    """
+    Fills orders against replayed prices: MARKET immediately at the last price,
+    LIMIT when the price trades through it, STOP_LIMIT once triggered.
+    Returns Binance-shaped order responses.
+    """
+    def __init__(self):
+        self.last_price: Dict[str, float] = {}
+        self.resting: Dict[str, List[dict]] = defaultdict(list)
+        self._next_id = 1
+
+    def place_order(self, order: dict) -> dict:
+        order_id, self._next_id = self._next_id, self._next_id + 1
+        response = {
+            "orderId": order_id,
+            "symbol": order["symbol"],
+            "side": order["side"],
+            "type": order["type"],
+            "status": "NEW",
+            "executedQty": "0",
+            "avgPrice": "0.00"
+        }
+        last = self.last_price.get(order["symbol"])
+        if order["type"] == "MARKET" and last is not None:
+            response.update(status="FILLED", executedQty=str(order["quantity"]), avgPrice=str(last))
+        else:
+            self.resting[order["symbol"]].append({**order, "orderId": order_id, "triggered": order["type"] != "STOP_LIMIT"})
+        return response
+
+    def on_price(self, symbol: str, price: float) -> List[dict]:
+        """
+        Updates the last price and returns resting orders that filled.
+        """
+        self.last_price[symbol] = price
+        orders = self.resting.get(symbol)
+        if not orders:
+            return []
+        filled, still_resting = [], []
+        for o in orders:
+            buy = o["side"] == "BUY"
+            if not o["triggered"]:
+                o["triggered"] = price >= o["stop_price"] if buy else price <= o["stop_price"]
+            if o["type"] == "MARKET":
+                # Sent before the first price for its symbol: fills at the next one
+                filled.append({**o, "price": price})
+            elif o["triggered"] and (price <= o["price"] if buy else price >= o["price"]):
+                filled.append(o)
+            else:
+                still_resting.append(o)
+        self.resting[symbol] = still_resting
+        return filled
+
+
+TERMINAL_STATUSES = {"FILLED", "CANCELED", "EXPIRED", "REJECTED", "EXPIRED_IN_MATCH"}
+
+class StrategyRuntime:
+    """
+    Event loop that delivers price and fill events to registered strategies and
+    routes their order intents through InputValidator to an executor:
+    an OrderManager in live mode, a PaperBroker in replay mode.
+    Live orders that don't fill immediately are polled every
+    `fill_poll_interval` seconds until they reach a terminal status; orders
+    whose placement outcome is unknown are looked up by client order ID.
+    """
+    def __init__(self, clock, order_manager: Optional[OrderManager] = None, broker: Optional[PaperBroker] = None,
+                 fill_poll_interval: float = 2.0):
+        self.clock = clock
+        self.order_manager = order_manager
+        self.broker = broker
+        self.fill_poll_interval = fill_poll_interval
+        # orderId -> {strategy, symbol, side, executed, notional} for live orders still working
+        self._open: Dict[object, dict] = {}
+        # clientOrderId -> {strategy, symbol} for placements that may or may not have landed
+        self._unknown: Dict[str, dict] = {}
+        self.strategies: List[Strategy] = []
+        # symbol -> tuple of bound on_price handlers, rebuilt on registration
+        self._price_routes: Dict[str, tuple] = {}
+        self._wildcard: tuple = ()
+        self._owners: Dict[object, Strategy] = {}
+        self._pending = set()
+        self.events = 0
+
+    def add(self, strategy: Strategy):
+        strategy.runtime = self
+        self.strategies.append(strategy)
+        self._price_routes = {}
+        self._wildcard = tuple(s.on_price for s in self.strategies if not s.symbols)
+        return strategy
+
+    def _handlers(self, symbol: str) -> tuple:
+        handlers = self._price_routes.get(symbol)
+        if handlers is None:
+            handlers = self._wildcard + tuple(s.on_price for s in self.strategies if symbol in s.symbols)
+            self._price_routes[symbol] = handlers
+        return handlers
+
+    def submit(self, strategy: Strategy, symbol, side, order_type, quantity, price=None, stop_price=None):
+        clean = InputValidator.validate_inputs(symbol, side, order_type, quantity, price, stop_price)
+        if self.broker is not None:
+            response = self.broker.place_order(clean)
+            if response["status"] == "NEW":
+                self._owners[response["orderId"]] = strategy
+            else:
+                self._on_order_update(strategy, response)
+            return
+
+        # Live: run the blocking REST call off the loop so dispatch never stalls
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(None, self.order_manager.place_order, clean)
+        self._pending.add(task)
+        task.add_done_callback(lambda t: self._on_live_response(strategy, t))
+
+    def _on_live_response(self, strategy: Strategy, task):
+        self._pending.discard(task)
+        try:
+            response = task.result()
+        except OutcomeUnknownError as e:
+            logging.error("Strategy %s order outcome unknown, reconciling: %s", strategy.name, str(e))
+            if e.client_order_id:
+                self._unknown[e.client_order_id] = {"strategy": strategy, "symbol": e.symbol}
+            return
+        except Exception as e:
+            logging.error("Strategy %s order failed: %s", strategy.name, str(e))
+            return
+        self._on_order_update(strategy, response)
+
+    def _on_order_update(self, strategy: Strategy, response: dict):
+        """
+        Emits a FillEvent for whatever quantity executed since the order's last
+        update and keeps tracking the order until its status is terminal.
+        """
+        order_id = response.get("orderId")
+        state = self._open.pop(order_id, None) or {
+            "strategy": strategy, "symbol": response.get("symbol"), "side": response.get("side"),
+            "executed": 0.0, "notional": 0.0
+        }
+        executed = float(response.get("executedQty") or 0)
+        notional = executed * float(response.get("avgPrice") or 0)
+        if executed > state["executed"]:
+            # avgPrice is cumulative, so the new slice's price comes from the notional delta
+            qty = executed - state["executed"]
+            price = (notional - state["notional"]) / qty
+            state["executed"], state["notional"] = executed, notional
+            event = FillEvent(state["symbol"], state["side"], qty, price, order_id, self.clock.now())
+            self._safe_call(state["strategy"], state["strategy"].on_fill, event)
+        if response.get("status") not in TERMINAL_STATUSES:
+            self._open[order_id] = state
+
+    async def _poll_fills(self):
+        """
+        Queries every working live order's status and reports new fills, and
+        settles placements whose outcome is unknown.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.fill_poll_interval)
+            working = list(self._open.items())
+            unknown = list(self._unknown.items())
+            if not working and not unknown:
+                continue
+            results = await asyncio.gather(*(
+                loop.run_in_executor(None, self.order_manager.get_order, state["symbol"], order_id)
+                for order_id, state in working
+            ), *(
+                loop.run_in_executor(None, self.order_manager.reconcile_order, state["symbol"], client_order_id)
+                for client_order_id, state in unknown
+            ), return_exceptions=True)
+            for (order_id, state), result in zip(working, results):
+                if isinstance(result, Exception):
+                    logging.error("Order status poll failed for %s: %s", order_id, str(result))
+                else:
+                    self._on_order_update(state["strategy"], result)
+            for (client_order_id, state), result in zip(unknown, results[len(working):]):
+                if isinstance(result, Exception):
+                    logging.error("Order reconciliation failed for %s: %s", client_order_id, str(result))
+                    continue
+                del self._unknown[client_order_id]
+                if result is None:
+                    logging.warning("Order %s never reached the exchange", client_order_id)
+                else:
+                    logging.info("Order %s reconciled: %s", client_order_id, result.get("status"))
+                    self._on_order_update(state["strategy"], result)
+
+    def _safe_call(self, strategy, handler, event):
+        try:
+            handler(event)
+        except Exception as e:
+            logging.error("Strategy %s raised on %s: %s", strategy.name, type(event).__name__, str(e))
+
+    async def run(self, feed: AsyncIterator[PriceEvent]):
+        """
+        Consumes the feed until it is exhausted (replay) or cancelled (live).
+        """
+        for strategy in self.strategies:
+            strategy.on_start()
+        logging.info("Strategy runtime started with %s strategies", len(self.strategies))
+
+        broker, clock = self.broker, self.clock
+        poller = asyncio.ensure_future(self._poll_fills()) if self.order_manager is not None else None
+        try:
+            async for event in feed:
+                await clock.advance(event.ts)
+                self.events += 1
+                symbol = event.symbol
+                if broker is not None:
+                    for order in broker.on_price(symbol, event.price):
+                        strategy = self._owners.pop(order["orderId"])
+                        fill = FillEvent(symbol, order["side"], order["quantity"], order["price"], order["orderId"], event.ts)
+                        self._safe_call(strategy, strategy.on_fill, fill)
+                for handler in self._price_routes.get(symbol) or self._handlers(symbol):
+                    try:
+                        handler(event)
+                    except Exception as e:
+                        logging.error("Strategy handler %s raised: %s", handler.__qualname__, str(e))
+        finally:
+            if self._pending:
+                await asyncio.gather(*self._pending, return_exceptions=True)
+            if poller is not None:
+                poller.cancel()
+            if self._open:
+                logging.warning("Strategy runtime stopping with %s working order(s) untracked", len(self._open))
+            if self._unknown:
+                logging.warning("Strategy runtime stopping with %s order(s) of unknown outcome: %s",
+                                len(self._unknown), ", ".join(self._unknown))
+            for strategy in self.strategies:
+                strategy.on_stop()
+            logging.info("Strategy runtime stopped after %s events", self.events)
+
+
+async def replay_feed(path: str) -> AsyncIterator[PriceEvent]:
+    """
+    Reads recorded prices: JSON lines of {"ts": seconds, "symbol": ..., "price": ...}.
+    """
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield PriceEvent(record["symbol"], float(record["price"]), float(record["ts"]))
+
+async def live_price_feed(client, symbols: Iterable[str], interval: float = 1.0,
+                          record_path: Optional[str] = None, max_backoff: float = 30.0) -> AsyncIterator[PriceEvent]:
+    """
+    Polls /fapi/v1/ticker/price for all symbols in one call every `interval` seconds,
+    optionally recording every event in replay_feed format.
+    Failed polls are logged and retried with exponential backoff (up to
+    `max_backoff` seconds) instead of ending the feed.
+    """
+    wanted = {s.upper() for s in symbols}
+    loop = asyncio.get_running_loop()
+    record = open(record_path, "a") if record_path else None
+    delay = interval
+    try:
+        while True:
+            try:
+                prices = await loop.run_in_executor(None, client.request, "GET", "/fapi/v1/ticker/price")
+            except Exception as e:
+                logging.error("Price poll failed, retrying in %.1fs: %s", delay, str(e))
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_backoff)
+                continue
+            delay = interval
+            now = time.time()
+            for p in prices if isinstance(prices, list) else [prices]:
+                if not wanted or p.get("symbol") in wanted:
+                    if record is not None:
+                        record.write(json.dumps({"ts": now, "symbol": p["symbol"], "price": p["price"]}) + "\n")
+                    yield PriceEvent(p["symbol"], float(p["price"]), now)
+            await asyncio.sleep(interval)
+    finally:
+        if record is not None:
+            record.close()
+
+def parse_params(text: str) -> dict:
+    """
+    Parses "key=value,key=value"; values are JSON when they parse as JSON, else strings.
+    """
+    params = {}
+    for item in filter(None, text.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"❌ Invalid strategy parameter '{item}', expected key=value")
+        try:
+            params[key.strip()] = json.loads(value)
+        except ValueError:
+            params[key.strip()] = value
+    return params
+
+def load_strategy(spec: str, params: Optional[dict] = None) -> Strategy:
+    """
+    Instantiates a strategy from "package.module:ClassName[:key=value,...]".
+    Parameters in the spec belong to that strategy only; `params` overrides them.
+    """
+    module_name, _, rest = spec.partition(":")
+    class_name, _, param_text = rest.partition(":")
+    cls = getattr(importlib.import_module(module_name), class_name)
+    return cls(**{**parse_params(param_text), **(params or {})})
+
+def main(argv=None):
+    from bot.logging_config import setup_logging
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Run trading strategies live or against recorded prices")
+    parser.add_argument("--strategy", action="append", required=True,
+                        help="Strategy as module:Class[:key=value,...] (repeatable, parameters apply to that strategy only)")
+    parser.add_argument("--symbols", default="", help="Comma-separated symbols for the live feed (default: all)")
+    parser.add_argument("--interval", type=float, default=1.0, help="Live price poll interval in seconds")
+    parser.add_argument("--fill-interval", type=float, default=2.0, help="Live order status poll interval in seconds")
+    parser.add_argument("--record", help="Record live prices to this file for later replay")
+    parser.add_argument("--replay", help="Replay recorded prices from this JSON-lines file")
+    parser.add_argument("--speed", type=float, default=0.0, help="Replay speed multiplier (0 = as fast as possible)")
+    args = parser.parse_args(argv)
+
+    try:
+        strategies = [load_strategy(spec) for spec in args.strategy]
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.replay:
+        runtime = StrategyRuntime(ReplayClock(args.speed), broker=PaperBroker())
+        feed = replay_feed(args.replay)
+    else:
+        from bot.client import BinanceClient
+        client = BinanceClient()
+        runtime = StrategyRuntime(LiveClock(), order_manager=OrderManager(client), fill_poll_interval=args.fill_interval)
+        feed = live_price_feed(client, [s for s in args.symbols.split(",") if s], args.interval, args.record)
+
+    for strategy in strategies:
+        runtime.add(strategy)
+
+    started = time.perf_counter()
+    try:
+        asyncio.run(runtime.run(feed))
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.perf_counter() - started
+    print(f"Processed {runtime.events:,} events in {elapsed:.2f}s ({runtime.events / max(elapsed, 1e-9):,.0f} events/sec)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+import warnings
+from typing import Dict, List, Optional
+import numpy as np
+from bot.client import BinanceClient
+
+class FundingScanner:
+    """
+    Cross-symbol funding-rate and mark-price scanner.
+    One /fapi/v1/premiumIndex call returns every contract; each poll becomes a
+    row in NumPy ring buffers of shape (window, symbols), and all analytics are
+    computed column-wise without per-symbol Python loops.
+    Funding is annualized with each symbol's own interval from
+    /fapi/v1/fundingInfo (contracts not listed there settle every 8 hours).
+    """
+    FUNDING_INTERVAL_HOURS = 8
+    FUNDING_INFO_TTL = 3600  # seconds between /fapi/v1/fundingInfo refreshes
+    METRICS = ["mark_price", "index_price", "funding_rate", "funding_annualized", "basis", "basis_zscore", "change"]
+
+    def __init__(self, client: BinanceClient, window: int = 360, interval: float = 10.0):
+        self.client = client
+        self.window = window
+        self.interval = interval
+        self.symbols: List[str] = []
+        self._columns: Dict[str, int] = {}
+        self._capacity = 0
+        self.mark = self.index = self.funding = np.empty((window, 0))
+        self.funding_hours = np.empty(0)
+        self._interval_by_symbol: Dict[str, float] = {}
+        self._funding_info_at = 0.0
+        self.timestamps = np.zeros(window)
+        self._head = 0      # next row to write
+        self._count = 0     # rows filled so far (<= window)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _grow(self, needed: int):
+        capacity = max(needed, self._capacity * 2, 64)
+        def widen(buf):
+            wider = np.full((self.window, capacity), np.nan)
+            wider[:, :buf.shape[1]] = buf
+            return wider
+        self.mark, self.index, self.funding = widen(self.mark), widen(self.index), widen(self.funding)
+        hours = np.full(capacity, float(self.FUNDING_INTERVAL_HOURS))
+        hours[:len(self.funding_hours)] = self.funding_hours
+        self.funding_hours = hours
+        self._capacity = capacity
+
+    def set_funding_intervals(self, info: List[dict]):
+        """
+        Applies a /fapi/v1/fundingInfo response ({"symbol", "fundingIntervalHours"} per entry).
+        """
+        with self._lock:
+            self._interval_by_symbol = {
+                i["symbol"]: float(i["fundingIntervalHours"]) for i in info if i.get("fundingIntervalHours")
+            }
+            for name, col in self._columns.items():
+                self.funding_hours[col] = self._interval_by_symbol.get(name, self.FUNDING_INTERVAL_HOURS)
+
+    def ingest(self, payload: List[dict], ts: Optional[float] = None):
+        """
+        Appends one premiumIndex snapshot (list of per-symbol dicts) as a new row.
+        """
+        names = [p["symbol"] for p in payload]
+        with self._lock:
+            new = [name for name in names if name not in self._columns]
+            for name in new:
+                self._columns[name] = len(self.symbols)
+                self.symbols.append(name)
+            if len(self.symbols) > self._capacity:
+                self._grow(len(self.symbols))
+            for name in new:
+                self.funding_hours[self._columns[name]] = self._interval_by_symbol.get(name, self.FUNDING_INTERVAL_HOURS)
+
+            cols = np.fromiter((self._columns[n] for n in names), dtype=np.intp, count=len(names))
+            row = self._head
+            for buf, key in ((self.mark, "markPrice"), (self.index, "indexPrice"), (self.funding, "lastFundingRate")):
+                buf[row].fill(np.nan)
+                buf[row, cols] = np.array([p.get(key) or "nan" for p in payload], dtype=float)
+            self.timestamps[row] = ts if ts is not None else time.time()
+            self._head = (row + 1) % self.window
+            self._count = min(self._count + 1, self.window)
+
+    def _ordered(self, buf):
+        # Rows oldest -> newest for the filled part of the ring
+        rows = (self._head - self._count + np.arange(self._count)) % self.window
+        return buf[rows, :len(self.symbols)]
+
+    def analytics(self) -> Dict[str, np.ndarray]:
+        """
+        Returns one array per metric, aligned with self.symbols.
+        """
+        with self._lock:
+            if self._count == 0:
+                return {m: np.empty(0) for m in self.METRICS}
+            mark, index, funding = self._ordered(self.mark), self._ordered(self.index), self._ordered(self.funding)
+            hours = self.funding_hours[:len(self.symbols)].copy()
+
+        # Symbols absent for the whole window are all-NaN columns; their metrics stay NaN
+        with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            basis = (mark - index) / index
+            basis_mean = np.nanmean(basis, axis=0)
+            basis_std = np.nanstd(basis, axis=0)
+            zscore = np.where(basis_std > 0, (basis[-1] - basis_mean) / basis_std, 0.0)
+            zscore[np.isnan(basis_std) | np.isnan(basis[-1])] = np.nan
+
+            # Change vs. the oldest valid mark price in the window
+            first_valid = np.argmax(~np.isnan(mark), axis=0)
+            oldest = mark[first_valid, np.arange(mark.shape[1])]
+            change = mark[-1] / oldest - 1
+
+        return {
+            "mark_price": mark[-1],
+            "index_price": index[-1],
+            "funding_rate": funding[-1],
+            "funding_annualized": funding[-1] * (365 * 24 / hours),
+            "funding_interval_hours": hours,
+            "basis": basis[-1],
+            "basis_zscore": zscore,
+            "change": change,
+        }
+
+    def ranked(self, sort_by: str = "funding_annualized", limit: int = 20,
+               ascending: bool = False, absolute: bool = False) -> List[dict]:
+        """
+        Symbols ranked by a metric (NaNs last). `absolute` ranks by magnitude,
+        e.g. sort_by="change", absolute=True for top movers in either direction.
+        """
+        if sort_by not in self.METRICS:
+            raise ValueError(f"❌ Sort must be one of {', '.join(self.METRICS)}")
+        metrics = self.analytics()
+        key = metrics[sort_by]
+        if absolute:
+            key = np.abs(key)
+        if not ascending:
+            key = -key
+        order = np.argsort(np.where(np.isnan(key), np.inf, key), kind="stable")[:limit]
+
+        symbols = self.symbols
+        rows = []
+        for i in order:
+            row = {"symbol": symbols[i]}
+            for m in self.METRICS:
+                value = metrics[m][i]
+                row[m] = None if np.isnan(value) else float(value)
+            row["funding_interval_hours"] = float(metrics["funding_interval_hours"][i])
+            rows.append(row)
+        return rows
+
+    def refresh_funding_info(self):
+        """
+        Reloads per-symbol funding intervals if the cached ones are older than
+        FUNDING_INFO_TTL. On failure the previous intervals are kept.
+        """
+        if time.time() - self._funding_info_at < self.FUNDING_INFO_TTL:
+            return
+        try:
+            self.set_funding_intervals(self.client.request("GET", "/fapi/v1/fundingInfo"))
+            self._funding_info_at = time.time()
+        except Exception as e:
+            logging.error("Funding info refresh failed, keeping previous intervals: %s", str(e))
+
+    def poll(self):
+        self.refresh_funding_info()
+        payload = self.client.request("GET", "/fapi/v1/premiumIndex")
+        self.ingest(payload)
+
+    def start(self):
+        """
+        Polls once immediately, then keeps polling in a background thread.
+        """
+        if self._thread is not None:
+            return
+        self.poll()
+
+        def loop():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.poll()
+                except Exception as e:
+                    logging.error("Funding scanner poll failed: %s", str(e))
+
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+        logging.info("Funding scanner started (%s symbols, every %ss, window %s)",
+                     len(self.symbols), self.interval, self.window)
+
+if __name__ == "__main__":
+    from bot.logging_config import setup_logging
+    setup_logging()
+    scanner = FundingScanner(BinanceClient())
+    scanner.poll()
+    for row in scanner.ranked(limit=10):
+        print(row)
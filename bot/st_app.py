@@ -3,15 +3,21 @@ import requests
 import json
 import os
 import sys
+import threading
 import time
-from dotenv import load_dotenv
+from collections import deque
 
-# Fix path for Streamlit when running from subfolder
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Fix path for Streamlit when running from subfolder (the script re-executes on
+# every interaction, so only add it once)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
 
-from bot.parser import CommandParser
+from bot.config import get_settings
+from bot.parser import CommandParser, SymbolIndex
 
-load_dotenv()
+# Parsed once per process, not on every rerun
+settings = get_settings()
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -57,31 +63,149 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- BACKEND API SETTINGS ---
-API_BASE_URL = os.getenv("API_URL", "http://127.0.0.1:8000")
-IS_SIMULATION = os.getenv("SIMULATION_MODE", "False").lower() == "true"
+API_BASE_URL = settings.api_url
+IS_SIMULATION = settings.simulation_mode
+
+# --- UI PERFORMANCE SETTINGS ---
+TELEMETRY_TTL = settings.telemetry_ttl            # seconds between background telemetry refreshes
+SIDEBAR_REFRESH = settings.sidebar_refresh        # seconds between sidebar auto-refreshes
+CHAT_HISTORY_LIMIT = settings.chat_history_limit  # messages kept in the ring buffer
+CHAT_PAGE_SIZE = settings.chat_page_size          # messages rendered per page
+CHAT_HISTORY_FILE = settings.chat_history_file    # optional JSON-lines persistence
+
+WELCOME_MESSAGE = {"role": "assistant", "content": "Welcome to **Alpha Terminal**. I am ready to execute your orders.\n\nYou can say things like:\n- `Buy 0.01 BTC at market`\n- `Limit sell 0.5 ETH at 2500`"}
+
+# st.fragment (1.37+) reruns only the decorated function; older versions render it inline
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
 
 # --- HELPER FUNCTIONS ---
-def get_account_data():
+def fetch_account_data():
     try:
         response = requests.get(f"{API_BASE_URL}/account", timeout=3)
         if response.status_code == 200:
             return response.json()
     except: pass
-    return {"wallet_balance": "0.00", "assets_count": 0}
+    return None
 
-def get_symbol_price(symbol):
+def fetch_symbol_price(symbol):
     try:
         response = requests.get(f"{API_BASE_URL}/price/{symbol}", timeout=3)
         if response.status_code == 200:
-            return response.json().get("price", "0.00")
+            return response.json().get("price")
     except: pass
-    return "0.00"
+    return None
 
-# --- SIDEBAR ---
-with st.sidebar:
-    st.markdown("<h2 style='text-align: center; color: #00ffcc;'>Alpha ⚡ Bot</h2>", unsafe_allow_html=True)
-    st.markdown("---")
-    
+@st.cache_resource
+def start_telemetry_poller():
+    """
+    Refreshes account and price telemetry every TELEMETRY_TTL seconds in a
+    background thread, once per server process. Renders only read the last
+    values, so neither reruns nor sidebar refreshes ever wait on the API.
+    """
+    latest = {"account": {"wallet_balance": "0.00", "assets_count": 0}, "prices": {"BTCUSDT": "0.00"}}
+
+    def poll():
+        while True:
+            account = fetch_account_data()
+            if account is not None:
+                latest["account"] = account
+            for symbol in list(latest["prices"]):
+                price = fetch_symbol_price(symbol)
+                if price is not None:
+                    latest["prices"][symbol] = price
+            time.sleep(TELEMETRY_TTL)
+
+    threading.Thread(target=poll, daemon=True).start()
+    return latest
+
+def get_account_data():
+    return start_telemetry_poller()["account"]
+
+def get_symbol_price(symbol):
+    # Unseen symbols are picked up by the poller's next pass
+    return start_telemetry_poller()["prices"].setdefault(symbol, "0.00")
+
+SYMBOLS_RETRY = 30  # seconds between /symbols attempts while the API is unreachable
+
+@st.cache_resource
+def start_symbol_loader():
+    """
+    Loads the exchange symbol list for the command parser in a background
+    thread, once per server process, retrying until the API answers.
+    Reruns never wait on it; until it lands the parser uses its built-in list.
+    """
+    def load():
+        while True:
+            try:
+                response = requests.get(f"{API_BASE_URL}/symbols", timeout=3)
+                response.raise_for_status()
+                CommandParser.set_symbol_index(SymbolIndex(response.json()["symbols"], strict=True))
+                return
+            except Exception:
+                time.sleep(SYMBOLS_RETRY)
+
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
+start_symbol_loader()
+
+def describe_intent(intent):
+    if intent["type"] == "CANCEL_ALL":
+        return f"CANCEL ALL {intent['symbol']}"
+    if intent["type"] == "CANCEL":
+        return f"CANCEL #{intent['order_id']} {intent['symbol']}"
+    if intent["type"] == "MODIFY":
+        return f"MODIFY #{intent['order_id']} → {intent['side']} {intent['quantity']} {intent['symbol']} @ {intent['price']}"
+    return f"{intent['side']} {intent['quantity']} {intent['symbol']} ({intent['type']})"
+
+def submit_intent(intent):
+    """
+    Routes a parsed command to the matching API endpoint.
+    """
+    if intent["type"] == "CANCEL_ALL":
+        return requests.delete(f"{API_BASE_URL}/orders/{intent['symbol']}", timeout=10)
+    if intent["type"] == "CANCEL":
+        return requests.delete(f"{API_BASE_URL}/order/{intent['symbol']}/{intent['order_id']}", timeout=10)
+    if intent["type"] == "MODIFY":
+        return requests.put(f"{API_BASE_URL}/order", json=intent, timeout=10)
+    return requests.post(f"{API_BASE_URL}/place_order", json=intent, timeout=10)
+
+def load_history():
+    """
+    Builds the chat ring buffer, restoring the newest persisted messages if enabled.
+    """
+    messages = deque(maxlen=CHAT_HISTORY_LIMIT)
+    if CHAT_HISTORY_FILE and os.path.exists(CHAT_HISTORY_FILE):
+        lines = 0
+        with open(CHAT_HISTORY_FILE) as f:
+            for line in f:
+                lines += 1
+                try:
+                    messages.append(json.loads(line))
+                except ValueError: pass
+        # Compact the file so it stays bounded like the buffer
+        if lines > CHAT_HISTORY_LIMIT:
+            with open(CHAT_HISTORY_FILE, "w") as f:
+                f.writelines(json.dumps(m) + "\n" for m in messages)
+    if not messages:
+        messages.append(WELCOME_MESSAGE)
+    return messages
+
+def add_message(role, content):
+    message = {"role": role, "content": content}
+    st.session_state.messages.append(message)
+    if CHAT_HISTORY_FILE:
+        with open(CHAT_HISTORY_FILE, "a") as f:
+            f.write(json.dumps(message) + "\n")
+
+def clear_history():
+    st.session_state.messages = deque([WELCOME_MESSAGE], maxlen=CHAT_HISTORY_LIMIT)
+    st.session_state.chat_pages = 1
+    if CHAT_HISTORY_FILE and os.path.exists(CHAT_HISTORY_FILE):
+        os.remove(CHAT_HISTORY_FILE)
+
+def render_telemetry():
     # Portfolio Snapshot
     st.subheader("📊 Portfolio Status")
     acc = get_account_data()
@@ -91,27 +215,43 @@ with st.sidebar:
     st.subheader("🌎 Market Info")
     btc_price = get_symbol_price("BTCUSDT")
     st.metric("BTC Price", f"${float(btc_price):,.2f}")
+
+if _fragment:
+    render_telemetry = _fragment(run_every=SIDEBAR_REFRESH)(render_telemetry)
+
+# --- SIDEBAR ---
+with st.sidebar:
+    st.markdown("<h2 style='text-align: center; color: #00ffcc;'>Alpha ⚡ Bot</h2>", unsafe_allow_html=True)
+    st.markdown("---")
+    
+    render_telemetry()
     
     st.markdown("---")
     env_label = "🟡 SIMULATION" if IS_SIMULATION else "🟢 REAL TESTNET"
     st.markdown(f"**Runtime**: `{env_label}`")
     
     if st.button("🗑️ Clear Chat History", use_container_width=True):
-        st.session_state.messages = []
+        clear_history()
         st.rerun()
 
 # --- CHAT INTERFACE ---
 st.title("🤖 AI Trading Terminal")
 st.markdown("*Talk to your bot. Execute professional trades in seconds.*")
 
-# Initialize chat history
+# Initialize chat history (bounded ring buffer)
 if "messages" not in st.session_state:
-    st.session_state.messages = [
-        {"role": "assistant", "content": "Welcome to **Alpha Terminal**. I am ready to execute your orders.\n\nYou can say things like:\n- `Buy 0.01 BTC at market`\n- `Limit sell 0.5 ETH at 2500`"}
-    ]
+    st.session_state.messages = load_history()
+if "chat_pages" not in st.session_state:
+    st.session_state.chat_pages = 1
 
-# Display chat history
-for message in st.session_state.messages:
+# Display chat history, newest page(s) only
+visible = CHAT_PAGE_SIZE * st.session_state.chat_pages
+hidden = len(st.session_state.messages) - visible
+if hidden > 0:
+    if st.button(f"⬆️ Load older messages ({hidden} hidden)"):
+        st.session_state.chat_pages += 1
+        st.rerun()
+for message in list(st.session_state.messages)[max(hidden, 0):]:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
 
@@ -120,7 +260,7 @@ if prompt := st.chat_input("Command: e.g. Buy 0.01 BTC"):
     # User Message
     with st.chat_message("user"):
         st.markdown(prompt)
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    add_message("user", prompt)
 
     # AI Processing
     with st.chat_message("assistant"):
@@ -128,28 +268,28 @@ if prompt := st.chat_input("Command: e.g. Buy 0.01 BTC"):
             intent = CommandParser.parse(prompt)
             
             if intent:
-                st.info(f"📍 **Target Identified**: {intent['side']} {intent['quantity']} {intent['symbol']} ({intent['type']})")
+                st.info(f"📍 **Target Identified**: {describe_intent(intent)}")
                 
                 # Execution
                 try:
-                    res = requests.post(f"{API_BASE_URL}/place_order", json=intent, timeout=10)
+                    res = submit_intent(intent)
                     data = res.json()
                     
                     if res.status_code == 200:
                         success_msg = f"🛡️ **Execution Successful**\n\n```\n{data.get('details')}\n```"
                         st.success(success_msg)
-                        st.session_state.messages.append({"role": "assistant", "content": success_msg})
+                        add_message("assistant", success_msg)
                     else:
                         err_msg = f"❌ **Exchange Rejection**: {data.get('detail', 'Network failure')}"
                         st.error(err_msg)
-                        st.session_state.messages.append({"role": "assistant", "content": err_msg})
+                        add_message("assistant", err_msg)
                 except Exception as e:
                     sys_err = f"⚠️ **Critical System Error**: {str(e)}"
                     st.error(sys_err)
-                    st.session_state.messages.append({"role": "assistant", "content": sys_err})
+                    add_message("assistant", sys_err)
             else:
                 fail_msg = "⚠️ **Invalid Input**: I couldn't parse that command. Please use the format: `[Action] [Qty] [Symbol] at [Price/Market]`."
                 st.warning(fail_msg)
-                st.session_state.messages.append({"role": "assistant", "content": fail_msg})
+                add_message("assistant", fail_msg)
 
 # Scroll to bottom logic is automatic in modern Streamlit chat_input
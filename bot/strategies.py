@@ -0,0 +1,37 @@
+import logging
+from collections import deque
+from bot.runtime import Strategy, PriceEvent, FillEvent
+
+class MovingAverageCross(Strategy):
+    """
+    Example strategy: goes long when the fast moving average crosses above the
+    slow one and flattens when it crosses back below.
+    Parameters: symbol, fast, slow, quantity.
+    """
+    def __init__(self, symbol: str = "BTCUSDT", fast: int = 5, slow: int = 20, quantity: float = 0.001, **params):
+        super().__init__(**params)
+        self.symbols = [symbol.upper()]
+        self.fast, self.slow, self.quantity = int(fast), int(slow), float(quantity)
+        self.prices = deque(maxlen=self.slow)
+        self.position = 0.0
+        self.fills = 0
+
+    def on_price(self, event: PriceEvent):
+        self.prices.append(event.price)
+        if len(self.prices) < self.slow:
+            return
+        fast_ma = sum(list(self.prices)[-self.fast:]) / self.fast
+        slow_ma = sum(self.prices) / self.slow
+        if fast_ma > slow_ma and self.position <= 0:
+            self.submit(event.symbol, "BUY", "MARKET", self.quantity)
+            self.position = self.quantity
+        elif fast_ma < slow_ma and self.position > 0:
+            self.submit(event.symbol, "SELL", "MARKET", self.position)
+            self.position = 0.0
+
+    def on_fill(self, event: FillEvent):
+        self.fills += 1
+        logging.info("%s filled: %s %s %s @ %s", self.name, event.side, event.quantity, event.symbol, event.price)
+
+    def on_stop(self):
+        logging.info("%s stopped after %s fills, position %s", self.name, self.fills, self.position)
@@ -1,4 +1,5 @@
 import logging
+import math
 
 class InputValidator:
     """
@@ -47,7 +48,7 @@ class InputValidator:
         """
         try:
             qty = float(quantity)
-            if qty <= 0:
+            if not 0 < qty < math.inf:
                 raise ValueError("❌ Quantity must be positive")
             return qty
         except (TypeError, ValueError):
@@ -63,7 +64,7 @@ class InputValidator:
         
         try:
             p = float(price)
-            if p <= 0:
+            if not 0 < p < math.inf:
                 raise ValueError("❌ Price must be positive")
             return p
         except (TypeError, ValueError):
@@ -95,3 +96,44 @@ class InputValidator:
             "price": clean_price,
             "stop_price": clean_stop
         }
+
+    @staticmethod
+    def validate_order_id(order_id):
+        """
+        Validates an exchange order ID (positive integer).
+        """
+        try:
+            oid = int(order_id)
+            if oid <= 0:
+                raise ValueError
+            return oid
+        except (TypeError, ValueError):
+            raise ValueError("❌ Order ID must be a positive integer")
+
+    @staticmethod
+    def validate_command(command: dict):
+        """
+        Validates any parsed command: a new order, CANCEL, CANCEL_ALL or MODIFY.
+        """
+        command_type = str(command.get("type", "")).upper()
+        if command_type == "CANCEL_ALL":
+            return {"type": command_type, "symbol": InputValidator.validate_symbol(command.get("symbol"))}
+        if command_type == "CANCEL":
+            return {
+                "type": command_type,
+                "symbol": InputValidator.validate_symbol(command.get("symbol")),
+                "order_id": InputValidator.validate_order_id(command.get("order_id"))
+            }
+        if command_type == "MODIFY":
+            return {
+                "type": command_type,
+                "symbol": InputValidator.validate_symbol(command.get("symbol")),
+                "order_id": InputValidator.validate_order_id(command.get("order_id")),
+                "side": InputValidator.validate_side(command.get("side") or ""),
+                "quantity": InputValidator.validate_quantity(command.get("quantity")),
+                "price": InputValidator.validate_price(command.get("price"))
+            }
+        return InputValidator.validate_inputs(
+            command.get("symbol"), command.get("side") or "", command_type, command.get("quantity"),
+            command.get("price"), command.get("stop_price")
+        )
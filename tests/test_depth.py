@@ -0,0 +1,171 @@
+import json
+import os
+import time
+import pytest
+from bot.client import BinanceAPIError
+from bot.depth import DepthBook, DepthBookManager
+
+DATA = os.path.join(os.path.dirname(__file__), "data", "depth_btcusdt.jsonl")
+
+
+def _recorded():
+    with open(DATA) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _event(first, final, prev, bids=(), asks=(), symbol="BTCUSDT"):
+    return {"e": "depthUpdate", "s": symbol, "U": first, "u": final, "pu": prev, "b": list(bids), "a": list(asks)}
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class StubClient:
+    """
+    Answers exchangeInfo and depth requests from canned data; `depth` may be a
+    list of snapshots/exceptions consumed one per request.
+    """
+    simulation_mode = True
+
+    def __init__(self, depth, symbols=("BTCUSDT", "ETHUSDT")):
+        self.depth = list(depth)
+        self.symbols = symbols
+        self.calls = []
+
+    def request(self, method, endpoint, params=None, signed=False):
+        self.calls.append(endpoint)
+        if endpoint == "/fapi/v1/exchangeInfo":
+            return {"symbols": [{"symbol": s, "status": "TRADING"} for s in self.symbols]}
+        result = self.depth.pop(0) if len(self.depth) > 1 else self.depth[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_replay_applies_recorded_diffs_in_sequence():
+    manager = DepthBookManager()
+    assert manager.replay(DATA) == 4
+
+    book = manager.book("BTCUSDT")
+    assert book.synced
+    assert book.last_update_id == 115
+    # The stale diff (u=99 < lastUpdateId) was dropped, zero quantities removed levels
+    assert book.top(5) == {
+        "bids": [(43000.05, 0.4), (43000.0, 1.25), (42999.8, 3.0)],
+        "asks": [(43000.2, 4.0), (43000.25, 1.0), (43000.3, 0.5)],
+    }
+    assert book.spread() == pytest.approx(0.15)
+    assert book.cumulative(43000.0) == {"bids": pytest.approx(1.65), "asks": 0}
+
+def test_first_diff_must_straddle_snapshot():
+    snapshot, *events = _recorded()
+    book = DepthBook("BTCUSDT")
+    book.load_snapshot(snapshot)
+    # U > lastUpdateId: diffs between the snapshot and this event were missed
+    assert book.apply(_event(101, 104, 100)) is False
+    assert book.needs_snapshot
+
+    book = DepthBook("BTCUSDT")
+    book.load_snapshot(snapshot)
+    assert book.apply(events[1]) is True
+    # After the first diff, pu must chain to the previous u
+    assert book.apply(_event(106, 110, 105)) is False
+    assert book.needs_snapshot
+
+def test_gap_buffers_until_a_connecting_snapshot_arrives():
+    snapshot, *events = _recorded()
+    book = DepthBook("BTCUSDT")
+    book.load_snapshot(snapshot)
+    assert book.apply(events[1])
+    assert book.apply(_event(120, 125, 118, bids=[["43001.0", "1.0"]])) is False
+    assert not book.synced
+    # Diffs keep arriving while the new snapshot is fetched
+    assert book.apply(_event(126, 130, 125, asks=[["43002.0", "2.0"]]))
+
+    # Older than the buffered diffs: still out of sync
+    assert book.load_snapshot({"lastUpdateId": 110, "bids": [], "asks": []}) is False
+    assert book.load_snapshot({"lastUpdateId": 122, "bids": [["43000.0", "1.0"]],
+                               "asks": [["43003.0", "1.0"]]}) is True
+    assert book.last_update_id == 130
+    assert book.bids.best() == (43001.0, 1.0)
+    assert book.asks.best() == (43002.0, 2.0)
+
+def test_buffer_overflow_requires_a_new_snapshot():
+    book = DepthBook("BTCUSDT", max_buffer=3)
+    assert all(book.apply(_event(i, i, i - 1)) for i in range(1, 4))
+    assert book.apply(_event(4, 4, 3)) is False
+    # The oldest diff was dropped, so a snapshot from before it can't connect
+    assert book.load_snapshot({"lastUpdateId": 1, "bids": [], "asks": []}) is False
+    assert book.load_snapshot({"lastUpdateId": 3, "bids": [], "asks": []}) is True
+    assert book.last_update_id == 4
+
+def test_recorded_session_replays_to_the_same_book(tmp_path):
+    snapshot, *events = _recorded()
+    path = tmp_path / "session.jsonl"
+    client = StubClient([{k: v for k, v in snapshot.items() if k not in ("e", "s")}])
+    live = DepthBookManager(client, record_path=str(path))
+    live.track(["BTCUSDT"])
+    for event in events:
+        live.on_event(event)
+    live._record.close()
+
+    replayed = DepthBookManager()
+    replayed.replay(str(path))
+    assert replayed.book("BTCUSDT").top(10) == live.book("BTCUSDT").top(10)
+    assert replayed.book("BTCUSDT").last_update_id == 115
+
+def test_gap_triggers_background_resync(monkeypatch):
+    monkeypatch.setattr(DepthBookManager, "RESYNC_INITIAL_DELAY", 0.01)
+    snapshot, *events = _recorded()
+    first = {k: v for k, v in snapshot.items() if k not in ("e", "s")}
+    client = StubClient([first, BinanceAPIError("API Error: Too many requests", 429),
+                         {"lastUpdateId": 118, "bids": [["43000.0", "1.0"]], "asks": [["43001.0", "1.0"]]}])
+    manager = DepthBookManager(client)
+    manager.track(["BTCUSDT"])
+    manager.on_event(events[1])
+    manager.on_event(_event(116, 120, 114))
+
+    book = manager.book("BTCUSDT")
+    assert _wait_for(lambda: book.synced and "BTCUSDT" not in manager._resyncing)
+    assert book.last_update_id == 120
+
+def test_unknown_symbol_is_rejected_without_tracking():
+    client = StubClient([{"lastUpdateId": 1, "bids": [], "asks": []}])
+    manager = DepthBookManager(client)
+    with pytest.raises(ValueError, match="BOGUSUSDT"):
+        manager.track(["BOGUSUSDT"])
+    assert manager.books == {}
+    assert "/fapi/v1/depth" not in client.calls
+
+    # The exchange list is not reloaded for every bad request
+    with pytest.raises(ValueError):
+        manager.track(["BOGUSUSDT"])
+    assert client.calls.count("/fapi/v1/exchangeInfo") == 1
+
+def test_rejected_snapshot_drops_the_book():
+    client = StubClient([BinanceAPIError("API Error: Invalid symbol.", 400, -1121)])
+    manager = DepthBookManager(client)
+    with pytest.raises(ValueError, match="Invalid symbol"):
+        manager.track(["ETHUSDT"])
+    assert manager.book("ETHUSDT") is None
+    assert not manager._resyncing
+
+def test_resync_stops_on_non_retryable_error(monkeypatch):
+    monkeypatch.setattr(DepthBookManager, "RESYNC_INITIAL_DELAY", 0.01)
+    snapshot, *events = _recorded()
+    first = {k: v for k, v in snapshot.items() if k not in ("e", "s")}
+    client = StubClient([first, BinanceAPIError("API Error: Invalid symbol.", 400, -1121)])
+    manager = DepthBookManager(client)
+    manager.track(["BTCUSDT"])
+    manager.on_event(_event(200, 210, 199))
+
+    assert _wait_for(lambda: manager.book("BTCUSDT") is None)
+    assert not manager._resyncing
+
+def test_live_tracking_needs_a_client():
+    with pytest.raises(ValueError, match="BinanceClient"):
+        DepthBookManager().track(["BTCUSDT"])
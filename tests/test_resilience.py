@@ -0,0 +1,245 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from bot import client as client_module
+from bot.audit import AuditTrail
+from bot.client import BinanceAPIError, BinanceClient
+from bot.config import get_settings
+from bot.orders import OrderManager
+from bot.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, OutcomeUnknownError
+
+
+class StandIn:
+    """
+    Local HTTP server standing in for one Binance base URL. `delay` stalls
+    every non-ping request, `status`/`body` set the answer; both can be
+    changed while it runs. Every request is recorded in `hits`.
+    """
+    def __init__(self, delay=0.0, status=200, body=None, ping_delay=0.0):
+        self.delay, self.status, self.ping_delay = delay, status, ping_delay
+        self.body = body if body is not None else {"ok": True}
+        self.hits = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _answer(self):
+                url = urlparse(self.path)
+                if url.path == "/fapi/v1/ping":
+                    time.sleep(stand_in.ping_delay)
+                    return self._send(200, {})
+                stand_in.hits.append((self.command, url.path, {k: v[0] for k, v in parse_qs(url.query).items()}))
+                time.sleep(stand_in.delay)
+                self._send(stand_in.status, stand_in.body)
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except OSError:
+                    pass  # the client already gave up
+
+            do_GET = do_POST = do_PUT = do_DELETE = _answer
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def paths(self, method=None):
+        return [path for m, path, _ in self.hits if method in (None, m)]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _refused_url():
+    # A port that was free a moment ago: connecting is refused outright
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def stand_ins():
+    servers = []
+
+    def start(**kwargs):
+        server = StandIn(**kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+@pytest.fixture
+def make_client(monkeypatch):
+    """
+    Builds a live (non-simulated) client for the given base URLs with fresh
+    process-wide health state. `probe=False` keeps the configured order.
+    """
+    def make(*urls, timeout=0.5, failures=5, reset=30.0, probe=False):
+        for key, value in {
+            "BINANCE_API_KEY": "key", "BINANCE_API_SECRET": "secret", "SIMULATION_MODE": "false",
+            "BINANCE_BASE_URLS": ",".join(urls), "HTTP_TIMEOUT": str(timeout),
+            "BREAKER_FAILURES": str(failures), "BREAKER_RESET_SECONDS": str(reset),
+        }.items():
+            monkeypatch.setenv(key, value)
+        get_settings.cache_clear()
+        monkeypatch.setattr(client_module, "_upstreams", {})
+        monkeypatch.setattr(client_module, "_endpoint_latency", {})
+        monkeypatch.setattr(client_module, "_probed", not probe)
+        return BinanceClient()
+
+    yield make
+    get_settings.cache_clear()
+
+
+def test_stalled_get_fails_over_to_next_url(stand_ins, make_client):
+    stalled, healthy = stand_ins(delay=2.0), stand_ins(body={"serverTime": 1})
+    client = make_client(stalled.url, healthy.url, timeout=0.3)
+
+    assert client.request("GET", "/fapi/v1/time") == {"serverTime": 1}
+    assert stalled.paths() == healthy.paths() == ["/fapi/v1/time"]
+    assert client_module._upstreams[stalled.url].breaker.failures == 1
+
+def test_refused_order_is_retried_elsewhere(stand_ins, make_client):
+    healthy = stand_ins(body={"orderId": 7, "status": "NEW"})
+    client = make_client(_refused_url(), healthy.url)
+
+    # The connection was refused, so the order provably never left: safe to resend
+    assert client.request("POST", "/fapi/v1/order", {"symbol": "BTCUSDT"}, signed=True)["orderId"] == 7
+    assert healthy.paths("POST") == ["/fapi/v1/order"]
+
+def test_stalled_order_raises_outcome_unknown_without_retry(stand_ins, make_client):
+    stalled, healthy = stand_ins(delay=2.0), stand_ins()
+    client = make_client(stalled.url, healthy.url, timeout=0.3)
+
+    with pytest.raises(OutcomeUnknownError, match="Outcome unknown"):
+        client.request("POST", "/fapi/v1/order", {"symbol": "BTCUSDT"}, signed=True)
+    assert stalled.paths("POST") == ["/fapi/v1/order"]
+    assert healthy.hits == []
+
+def test_5xx_fails_over_reads_but_not_orders(stand_ins, make_client):
+    broken, healthy = stand_ins(status=503, body={"code": -1000, "msg": "Unknown error"}), stand_ins()
+    client = make_client(broken.url, healthy.url)
+
+    with pytest.raises(OutcomeUnknownError, match="HTTP 503"):
+        client.request("PUT", "/fapi/v1/order", {"symbol": "BTCUSDT", "orderId": 1}, signed=True)
+    assert healthy.hits == []
+    assert client.request("GET", "/fapi/v1/openOrders") == {"ok": True}
+    assert broken.paths() == ["/fapi/v1/order", "/fapi/v1/openOrders"]
+    assert healthy.paths() == ["/fapi/v1/openOrders"]
+
+def test_4xx_is_raised_without_failover(stand_ins, make_client):
+    rejecting = stand_ins(status=400, body={"code": -1121, "msg": "Invalid symbol."})
+    healthy = stand_ins()
+    client = make_client(rejecting.url, healthy.url)
+
+    with pytest.raises(BinanceAPIError, match="Invalid symbol") as error:
+        client.request("GET", "/fapi/v1/depth", {"symbol": "NOPE"})
+    assert (error.value.status_code, error.value.code, error.value.retryable) == (400, -1121, False)
+    assert healthy.hits == []
+    # The upstream answered, so it is healthy as far as the breaker is concerned
+    assert client_module._upstreams[rejecting.url].breaker.state == CircuitBreaker.CLOSED
+
+def test_breaker_opens_fails_fast_and_recovers(stand_ins, make_client):
+    server = stand_ins(status=500)
+    client = make_client(server.url, failures=2, reset=0.3)
+    breaker = lambda: client_module._upstreams[server.url].breaker
+
+    for _ in range(2):
+        with pytest.raises(Exception, match="Network error: HTTP 500"):
+            client.request("GET", "/fapi/v1/time")
+    assert breaker().state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        client.request("GET", "/fapi/v1/time")
+    assert len(server.hits) == 2
+
+    time.sleep(0.35)
+    assert breaker().state == CircuitBreaker.HALF_OPEN
+    server.status = 200
+    assert client.request("GET", "/fapi/v1/time") == {"ok": True}
+    assert breaker().state == CircuitBreaker.CLOSED
+
+def test_half_open_trial_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    # Only one trial at a time while half-open
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_failover_order_follows_probed_latency(stand_ins, make_client):
+    slow, fast = stand_ins(ping_delay=0.2, body={"from": "slow"}), stand_ins(body={"from": "fast"})
+    client = make_client(slow.url, fast.url, probe=True)
+
+    assert client.request("GET", "/fapi/v1/time") == {"from": "fast"}
+    assert slow.hits == []
+
+    # Once the fast URL starts refusing, requests fall back to the slow one
+    fast.status = 502
+    assert client.request("GET", "/fapi/v1/time") == {"from": "slow"}
+    assert [url.base_url for url in client._ranked_upstreams()] == [fast.url, slow.url]
+
+def test_timeouts_raise_the_learned_timeout(stand_ins, make_client):
+    server = stand_ins(delay=1.3)
+    client = make_client(server.url, timeout=10)
+    tracker = client._endpoint_tracker("GET", "/fapi/v1/time")
+    for _ in range(tracker.min_samples):
+        tracker.observe(0.01)
+    assert tracker.timeout() == tracker.floor
+
+    # The endpoint got slower than its learned 1 s timeout: fail once, then adapt
+    with pytest.raises(Exception, match="Network error"):
+        client.request("GET", "/fapi/v1/time")
+    assert tracker.timeout() >= 2.0
+    assert client.request("GET", "/fapi/v1/time") == {"ok": True}
+    assert tracker.timeout() >= 1.3 * tracker.multiplier
+
+def test_timeout_backoff_decays_once_fast_again():
+    tracker = LatencyTracker()
+    for _ in range(100):
+        tracker.observe(0.01)
+    tracker.observe_timeout(1.0)
+    assert tracker.timeout() == 2.0
+    for _ in range(200):
+        tracker.observe(0.01)
+    assert tracker.timeout() == tracker.floor
+
+def test_unknown_order_outcome_can_be_reconciled(stand_ins, make_client, tmp_path):
+    server = stand_ins(delay=2.0)
+    manager = OrderManager(make_client(server.url, timeout=0.3), AuditTrail(str(tmp_path / "audit.bin")))
+
+    with pytest.raises(OutcomeUnknownError) as error:
+        manager.place_market_order("BTCUSDT", "BUY", 0.01)
+    sent = server.hits[0][2]
+    assert error.value.client_order_id == sent["newClientOrderId"]
+    assert error.value.symbol == "BTCUSDT"
+
+    # The exchange never saw it
+    server.delay, server.status, server.body = 0, 400, {"code": -2013, "msg": "Order does not exist."}
+    assert manager.reconcile_order("BTCUSDT", error.value.client_order_id) is None
+    # ...or it did
+    server.status, server.body = 200, {"orderId": 9, "clientOrderId": sent["newClientOrderId"], "status": "FILLED"}
+    assert manager.reconcile_order("BTCUSDT", error.value.client_order_id)["orderId"] == 9
+    assert server.hits[-1][2]["origClientOrderId"] == sent["newClientOrderId"]